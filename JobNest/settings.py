@@ -84,8 +84,8 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.AllowAny",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "apps.common.throttles.FailOpenAnonRateThrottle",
+        "apps.common.throttles.FailOpenUserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "1000/day", "user": "2500/day"},
     "NON_FIELD_ERRORS_KEY": "error",
@@ -131,14 +131,63 @@ INTERNAL_IPS = [
     "127.0.0.1",
 ]
 
+DEBUG_TOOLBAR_PANELS = [
+    "debug_toolbar.panels.history.HistoryPanel",
+    "debug_toolbar.panels.versions.VersionsPanel",
+    "debug_toolbar.panels.timer.TimerPanel",
+    "debug_toolbar.panels.settings.SettingsPanel",
+    "debug_toolbar.panels.headers.HeadersPanel",
+    "debug_toolbar.panels.request.RequestPanel",
+    "debug_toolbar.panels.sql.SQLPanel",
+    "debug_toolbar.panels.staticfiles.StaticFilesPanel",
+    "debug_toolbar.panels.templates.TemplatesPanel",
+    "debug_toolbar.panels.cache.CachePanel",
+    "apps.common.panels.CacheFamiliesPanel",  # Per-family cache metrics of the current process
+    "debug_toolbar.panels.signals.SignalsPanel",
+    "debug_toolbar.panels.redirects.RedirectsPanel",
+    "debug_toolbar.panels.profiling.ProfilingPanel",
+]
+
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.redis.RedisCache",
         "LOCATION": "redis://127.0.0.1:6379/1",
         "KEY_PREFIX": "jobnest",
+        # Fail fast when redis is slow or down, the cache helpers fall back to the database
+        "OPTIONS": {
+            "socket_timeout": 0.25,
+            "socket_connect_timeout": 0.25,
+        },
     }
 }
 
+# Stop calling redis after repeated failures and probe it again later, see utilities/circuit_breaker.py
+CACHE_CIRCUIT_BREAKER = {
+    "FAILURE_THRESHOLD": 5,
+    "RESET_TIMEOUT": 30,
+}
+
+# Per-process cache in front of redis for hot, read-mostly keys, kept in sync through redis pub/sub
+LOCAL_CACHE = {
+    "MAX_SIZE": 2048,
+    "TIMEOUT": 30,
+    "CHANNEL": "jobnest:cache_invalidation",
+}
+
+# Codec used to store cached payloads, see utilities/cache_codec.py
+CACHE_CODEC = {
+    "BACKEND": "utilities.cache_codec.MsgpackCodec",
+    "OPTIONS": {
+        "compress_threshold": 1024,
+    },
+}
+
+# Rebuild the responses warmed by `manage.py warm_cache` in the background whenever their families are invalidated
+WARM_CACHE_ON_INVALIDATION = False
+
+# Full-text job search backend, see apps/jobs/search.py. Left empty, the backend follows the database engine
+JOB_SEARCH_BACKEND = None
+
 SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "ACCESS_TOKEN_LIFETIME": timedelta(days=5),
@@ -56,6 +56,11 @@ def retrieve_chat_docs():
         """
         Retrieve specific chat
         """,
+        parameters=[
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, required=False,
+                             description="next_cursor of the previous page"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
+        ],
         tags=['Chat'],
         responses={
             status.HTTP_200_OK: OpenApiResponse(
@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import UniqueConstraint
+from django.db.models import Q, UniqueConstraint
 
 from apps.common.models import BaseModel
 
@@ -15,6 +15,14 @@ class Message(BaseModel):
     text = models.TextField(null=True, blank=True)
     is_read = models.BooleanField(default=False)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            # Conversation between two users, in order
+            models.Index(fields=['sender', 'receiver', 'created'], name='message_conversation_idx'),
+            # Unread count of a user
+            models.Index(fields=['receiver'], condition=Q(is_read=False), name='message_unread_idx'),
+        ]
+
     def __str__(self):
         return f"Message by {self.sender.email} to {self.receiver.email} : {self.text}"
 
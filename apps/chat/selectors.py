@@ -5,6 +5,7 @@ from rest_framework import status
 from apps.chat.models import Message, ArchivedMessage
 from apps.common.errors import ErrorCode
 from apps.common.exceptions import RequestError
+from utilities.caching import get_or_none_cached
 
 User = get_user_model()
 
@@ -60,7 +61,7 @@ def retrieve_chat_list_data(messages: QuerySet, current_user: User) -> dict:
 
 
 def get_friend_by_id(friend_id: str) -> User:
-    friend = User.objects.get_or_none(id=friend_id)
+    friend = get_or_none_cached(User, id=friend_id)
 
     if friend is None:
         raise RequestError(err_code=ErrorCode.NON_EXISTENT, err_msg="Friend does not exist",
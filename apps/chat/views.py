@@ -7,6 +7,7 @@ from apps.chat.filters import ChatFilter
 from apps.chat.selectors import *
 from apps.common.errors import ErrorCode
 from apps.common.exceptions import RequestError
+from apps.common.paginator import CursorPagination
 from apps.common.responses import CustomResponse
 
 User = get_user_model()
@@ -48,14 +49,19 @@ class RetrieveChatView(APIView):
         user = request.user
 
         messages = (
-            Message.objects.filter(Q(sender=user) | Q(receiver=user), Q(sender=friend) | Q(receiver=friend))
+            # One (sender, receiver) pair per direction, so each side is a lookup on the conversation index
+            Message.objects.filter(Q(sender=user, receiver=friend) | Q(sender=friend, receiver=user))
             .select_related("sender", "receiver").exclude(
                 archived_by_users__user=user
-            ).order_by("created")
+            )
         )
         messages.filter(sender=user).update(is_read=True)
 
-        data = retrieve_chat_data(messages=messages)
+        # Oldest messages first, each page continues the conversation
+        page = CursorPagination(descending=False).paginate_queryset(messages, request)
+
+        data = retrieve_chat_data(messages=page["items"])
+        data["next_cursor"] = page["next_cursor"]
         return CustomResponse.success(message="Returned specific chat", data=data)
 
 
@@ -0,0 +1,67 @@
+import time
+
+from django.db.models import Count
+
+from apps.jobs.models import Job, JobType
+from apps.jobs.views import JobsHomeView
+from apps.misc.models import FAQType
+from apps.misc.views import RetrieveAllTipsView, FilterAllFAQsView
+from utilities.cache_codec import get_cache_codec
+from utilities.caching import warm_view_cache
+
+DEFAULT_TOP_LOCATIONS = 5
+
+# Views get_warm_targets builds responses for
+WARMED_VIEWS = (JobsHomeView, RetrieveAllTipsView, FilterAllFAQsView)
+
+# Families the warmed responses are cached under, invalidating any other family leaves nothing to rewarm
+WARMED_FAMILIES = frozenset(
+    family for view_class in WARMED_VIEWS for family in view_class.get.cache_families if isinstance(family, str)
+)
+
+
+def get_warm_targets(top_locations: int = DEFAULT_TOP_LOCATIONS) -> list:
+    """
+        List the shared cached responses worth building ahead of the first request: the job feed with no filter,
+        for each job type and for the most common locations, and the tip and FAQ lists. Countries, job types and
+        FAQ types are served from the in-process reference data instead.
+
+        :param top_locations: Number of locations, by active jobs, to warm the job feed for.
+        :return: (view class, query params) pairs.
+    """
+    targets = [(JobsHomeView, {})]
+    targets += [(JobsHomeView, {"type": name}) for name in JobType.objects.values_list('name', flat=True)]
+
+    locations = (
+        Job.objects.get_active_jobs()
+        .values('location')
+        .annotate(jobs=Count('id'))
+        .order_by('-jobs')
+        .values_list('location', flat=True)[:top_locations]
+    )
+    targets += [(JobsHomeView, {"location": location}) for location in locations]
+
+    targets += [
+        (RetrieveAllTipsView, {}),
+        (FilterAllFAQsView, {}),
+    ]
+    targets += [(FilterAllFAQsView, {"type": name}) for name in FAQType.objects.values_list('name', flat=True)]
+
+    return targets
+
+
+def warm_cache_targets(targets: list):
+    """
+        Rebuild the cached response of every target.
+
+        :param targets: (view class, query params) pairs, as returned by get_warm_targets.
+        :return: Yields the cache key, build time in milliseconds and encoded size in bytes of every target.
+    """
+    codec = get_cache_codec()
+
+    for view_class, query_params in targets:
+        started = time.perf_counter()
+        cache_key, data = warm_view_cache(view_class, query_params=query_params)
+        build_time = (time.perf_counter() - started) * 1000
+
+        yield cache_key, build_time, len(codec.dumps(data))
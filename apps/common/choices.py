@@ -0,0 +1,8 @@
+from types import MappingProxyType
+
+import pycountry
+
+# Country alpha 2 code to name, built once from pycountry's database so serializing a row is a dict lookup
+COUNTRY_NAMES = MappingProxyType({country.alpha_2: country.name for country in pycountry.countries})
+
+COUNTRY_CHOICES = tuple(COUNTRY_NAMES.items())
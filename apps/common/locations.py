@@ -0,0 +1,87 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from types import MappingProxyType
+
+import pycountry
+
+# Names people use for a country that pycountry does not carry
+COUNTRY_ALIASES = {
+    "AE": ("UAE", "Emirates"),
+    "CD": ("DR Congo", "DRC", "Congo Kinshasa"),
+    "CG": ("Congo Brazzaville",),
+    "CI": ("Ivory Coast",),
+    "CZ": ("Czech Republic",),
+    "GB": ("UK", "Britain", "Great Britain", "England", "Scotland", "Wales", "Northern Ireland"),
+    "KP": ("North Korea",),
+    "NL": ("Holland",),
+    "RU": ("Russia",),
+    "US": ("USA", "America", "United States of America"),
+    "VN": ("Vietnam",),
+}
+
+# Shorter inputs only resolve on an exact name or code, prefixes that short match too many countries
+MIN_PREFIX_LENGTH = 3
+
+
+def normalize_location(text: str) -> str:
+    """
+        Lowercase the text, strip its accents and collapse everything but letters and digits to single spaces.
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(character for character in text if not unicodedata.combining(character))
+    return " ".join(re.findall(r"\w+", text.casefold()))
+
+
+def _build_location_indexes() -> tuple:
+    names, codes = {}, {}
+
+    for country in pycountry.countries:
+        fields = country._fields
+        country_names = [fields["name"], fields.get("official_name"), fields.get("common_name"),
+                         *COUNTRY_ALIASES.get(fields["alpha_2"], ())]
+
+        for name in filter(None, country_names):
+            names.setdefault(normalize_location(name), set()).add(fields["alpha_2"])
+        for code in (fields["alpha_2"], fields["alpha_3"]):
+            codes.setdefault(normalize_location(code), set()).add(fields["alpha_2"])
+
+    return tuple(
+        MappingProxyType({key: frozenset(value) for key, value in index.items()}) for index in (names, codes)
+    )
+
+
+# Normalized country names, official names, common names and aliases, and ISO codes, to the alpha 2 codes they
+# stand for
+LOCATION_NAMES, LOCATION_CODES = _build_location_indexes()
+
+_SORTED_LOCATION_NAMES = tuple(sorted(LOCATION_NAMES))
+
+
+def resolve_location(text: str, prefix: bool = True, codes: bool = True) -> frozenset:
+    """
+        Map free-text location input to the alpha 2 codes of the countries it names.
+
+        :param text: Country name, official name, common alias or ISO code, in any case, with or without accents.
+        :param prefix: Also match the countries with a name starting with the text, for partially typed input.
+        :param codes: Also match alpha 2 and alpha 3 codes. Turn off for free-text search, where short words
+                      like "it" or "can" are rarely meant as countries.
+        :return: Matching alpha 2 codes, empty when the text names no country.
+    """
+    normalized = normalize_location(text)
+    if not normalized:
+        return frozenset()
+
+    if codes and normalized in LOCATION_CODES:
+        return LOCATION_CODES[normalized]
+
+    if normalized in LOCATION_NAMES or not prefix or len(normalized) < MIN_PREFIX_LENGTH:
+        return LOCATION_NAMES.get(normalized, frozenset())
+
+    matches = set()
+    position = bisect_left(_SORTED_LOCATION_NAMES, normalized)
+    while position < len(_SORTED_LOCATION_NAMES) and _SORTED_LOCATION_NAMES[position].startswith(normalized):
+        matches |= LOCATION_NAMES[_SORTED_LOCATION_NAMES[position]]
+        position += 1
+
+    return frozenset(matches)
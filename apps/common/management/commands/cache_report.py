@@ -0,0 +1,81 @@
+import re
+from bisect import bisect_right
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utilities.cache_metrics import key_family
+from utilities.local_cache import get_redis_client
+
+# Lower bounds, in seconds, of the reported TTL ranges
+TTL_RANGES = ((0, "< 1m"), (60, "< 1h"), (60 * 60, "< 1d"), (60 * 60 * 24, ">= 1d"))
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Samples the cache keys in Redis and reports their count, size and TTLs per key family.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=100_000,
+                            help='Maximum number of keys to inspect.')
+
+    def handle(self, *args, **options):
+        client = get_redis_client()
+        if client is None:
+            raise CommandError("The default cache is not backed by Redis.")
+
+        key_prefix = settings.CACHES["default"].get("KEY_PREFIX", "")
+        # Keys are stored as "<KEY_PREFIX>:<version>:<key>"
+        stored_key = re.compile(rf"^{re.escape(key_prefix)}:\d+:")
+
+        families = {}
+        batch = []
+        sampled = 0
+
+        for redis_key in client.scan_iter(match=f"{key_prefix}:*", count=BATCH_SIZE):
+            batch.append(redis_key)
+            sampled += 1
+
+            if len(batch) == BATCH_SIZE or sampled == options['sample']:
+                self._inspect(client, batch, stored_key, families)
+                batch = []
+            if sampled == options['sample']:
+                break
+
+        if batch:
+            self._inspect(client, batch, stored_key, families)
+
+        self.stdout.write(f"{'Family':<40}{'Keys':>8}{'KiB':>12}  " + "".join(
+            f"{label:>8}" for _, label in TTL_RANGES) + f"{'no TTL':>8}")
+
+        for family, stats in sorted(families.items(), key=lambda item: -item[1]["bytes"]):
+            self.stdout.write(f"{family:<40}{stats['keys']:>8}{stats['bytes'] / 1024:>12.1f}  " + "".join(
+                f"{count:>8}" for count in stats["ttls"]))
+
+        self.stdout.write(self.style.SUCCESS(f"Sampled {sampled} of {client.dbsize()} keys."))
+
+    @staticmethod
+    def _inspect(client, redis_keys: list, stored_key, families: dict) -> None:
+        # One round trip per batch
+        pipeline = client.pipeline(transaction=False)
+        for redis_key in redis_keys:
+            pipeline.memory_usage(redis_key)
+            pipeline.ttl(redis_key)
+        results = pipeline.execute()
+
+        for redis_key, size, ttl in zip(redis_keys, results[::2], results[1::2]):
+            # Expired between SCAN and the pipeline
+            if size is None:
+                continue
+
+            family = key_family(stored_key.sub("", redis_key.decode()))
+            stats = families.setdefault(family, {"keys": 0, "bytes": 0, "ttls": [0] * (len(TTL_RANGES) + 1)})
+
+            stats["keys"] += 1
+            stats["bytes"] += size
+            # The last column counts keys without an expiry (TTL -1)
+            if ttl < 0:
+                stats["ttls"][-1] += 1
+            else:
+                stats["ttls"][bisect_right([bound for bound, _ in TTL_RANGES], ttl) - 1] += 1
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.cache_warming import get_warm_targets, warm_cache_targets, DEFAULT_TOP_LOCATIONS
+
+
+class Command(BaseCommand):
+    help = 'Builds the cached job feed and reference lists ahead of the first requests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-locations', type=int, default=DEFAULT_TOP_LOCATIONS,
+                            help='Number of locations, by active jobs, to warm the job feed for.')
+
+    def handle(self, *args, **options):
+        targets = get_warm_targets(top_locations=options['top_locations'])
+
+        total_time = total_size = 0
+        for cache_key, build_time, size in warm_cache_targets(targets):
+            total_time += build_time
+            total_size += size
+            self.stdout.write(f"{cache_key}  {build_time:.1f} ms  {size / 1024:.1f} KiB")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {len(targets)} keys in {total_time:.1f} ms ({total_size / 1024:.1f} KiB)."
+        ))
@@ -14,8 +14,4 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
-        indexes = [
-            models.Index(fields=['-created']),
-        ]
-
         ordering = ("-created",)
@@ -1,6 +1,13 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from uuid import UUID
+
 from django.core.paginator import InvalidPage
+from django.db.models import Q
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.settings import api_settings
 
 from apps.common.errors import ErrorCode
 from apps.common.exceptions import RequestError
@@ -45,3 +52,71 @@ class CustomPagination(PageNumberPagination):
             "items": data,
 
         }
+
+
+class CursorPagination(BasePagination):
+    """
+        Keyset pagination on (created, id). Every page is read from where the previous one ended, through the
+        `-created` index, so deep pages cost the same as the first one and no COUNT(*) is run.
+
+        The cursor handed to clients is opaque, it encodes the created time and id of the last row of a page.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def __init__(self, descending: bool = True):
+        self.descending = descending
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, api_settings.PAGE_SIZE))
+        except (TypeError, ValueError):
+            page_size = api_settings.PAGE_SIZE
+
+        return max(1, min(page_size, self.max_page_size))
+
+    @staticmethod
+    def encode_cursor(row) -> str:
+        position = f"{row.created.isoformat()}|{row.id}"
+        return urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        try:
+            created, row_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(created), UUID(row_id)
+        except (ValueError, UnicodeError, binascii.Error):
+            raise RequestError(
+                err_code=ErrorCode.INVALID_PAGE, err_msg="Invalid cursor", status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return the page of the queryset following the request's cursor, with the cursor of the next page, or
+        None on the last page.
+        """
+        page_size = self.get_page_size(request)
+
+        if self.descending:
+            queryset = queryset.order_by("-created", "-id")
+        else:
+            queryset = queryset.order_by("created", "id")
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created, row_id = self.decode_cursor(cursor)
+            after = "lt" if self.descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"created__{after}": created}) | Q(created=created, **{f"id__{after}": row_id})
+            )
+
+        # One extra row tells whether there is a next page
+        items = list(queryset[:page_size + 1])
+        next_cursor = self.encode_cursor(items[page_size - 1]) if len(items) > page_size else None
+
+        return {
+            "items": items[:page_size],
+            "per_page": page_size,
+            "next_cursor": next_cursor,
+        }
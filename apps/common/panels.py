@@ -0,0 +1,25 @@
+from debug_toolbar.panels import Panel
+
+from utilities.cache_metrics import cache_metrics, LATENCY_BUCKETS
+
+
+class CacheFamiliesPanel(Panel):
+    """
+        Debug toolbar panel showing the cache metrics recorded by this process, per key family.
+    """
+    title = "Cache families"
+    template = "debug_toolbar/panels/cache_families.html"
+
+    @property
+    def nav_subtitle(self):
+        families = self.get_stats().get("families", [])
+        hits = sum(family["hits"] for family in families)
+        reads = hits + sum(family["misses"] for family in families)
+
+        return f"{hits}/{reads} hits since start" if reads else ""
+
+    def generate_stats(self, request, response):
+        self.record_stats({
+            "families": cache_metrics.snapshot(),
+            "buckets": [f"≤ {bucket} ms" for bucket in LATENCY_BUCKETS] + [f"> {LATENCY_BUCKETS[-1]} ms"],
+        })
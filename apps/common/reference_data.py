@@ -0,0 +1,106 @@
+import threading
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+from apps.common.choices import COUNTRY_NAMES
+from apps.jobs.models import JobType
+from apps.misc.models import FAQType, Tip
+from utilities.caching import get_cache_versions, cache_breaker, is_version_unavailable
+from utilities.query_cache import table_family
+
+# The snapshot is reloaded whenever one of these tables is written to
+REFERENCE_FAMILIES = [table_family(model._meta.db_table) for model in (JobType, FAQType, Tip)]
+
+
+class Country(NamedTuple):
+    name: str
+    alpha_2: str
+
+
+class JobTypeEntry(NamedTuple):
+    id: object
+    name: str
+
+
+class FAQTypeEntry(NamedTuple):
+    id: object
+    name: str
+
+
+class TipEntry(NamedTuple):
+    id: object
+    title: str
+    author_image_url: str
+
+
+class ReferenceData(NamedTuple):
+    versions: tuple
+    countries: tuple
+    countries_by_code: MappingProxyType
+    job_types: tuple
+    job_types_by_id: MappingProxyType
+    job_type_ids_by_name: MappingProxyType
+    faq_types: tuple
+    faq_types_by_name: MappingProxyType
+    latest_tip: Optional[TipEntry]
+
+
+# Countries never change while the process runs, every snapshot shares them
+COUNTRIES = tuple(Country(name=name, alpha_2=alpha_2) for alpha_2, name in COUNTRY_NAMES.items())
+COUNTRIES_BY_CODE = MappingProxyType({country.alpha_2: country for country in COUNTRIES})
+
+
+def _load(versions: tuple) -> ReferenceData:
+    job_types = tuple(JobTypeEntry(id=job_type.id, name=job_type.name) for job_type in JobType.objects.only('name'))
+    faq_types = tuple(FAQTypeEntry(id=faq_type.id, name=faq_type.name) for faq_type in FAQType.objects.only('name'))
+    tip = Tip.objects.only('title', 'author_image').order_by('-created').first()
+
+    # Job type names are not unique, a name stands for every type carrying it
+    job_type_ids_by_name = {}
+    for job_type in job_types:
+        job_type_ids_by_name.setdefault(job_type.name, []).append(job_type.id)
+
+    return ReferenceData(
+        versions=versions,
+        countries=COUNTRIES,
+        countries_by_code=COUNTRIES_BY_CODE,
+        job_types=job_types,
+        job_types_by_id=MappingProxyType({job_type.id: job_type for job_type in job_types}),
+        job_type_ids_by_name=MappingProxyType({name: tuple(ids) for name, ids in job_type_ids_by_name.items()}),
+        faq_types=faq_types,
+        faq_types_by_name=MappingProxyType({faq_type.name: faq_type for faq_type in faq_types}),
+        latest_tip=TipEntry(id=tip.id, title=tip.title, author_image_url=tip.author_image_url) if tip else None,
+    )
+
+
+class ReferenceDataRegistry:
+    """
+        Immutable, per-process snapshot of the countries, job types, FAQ types and latest tip.
+
+        The snapshot is loaded on first use and reloaded when the version of one of its tables changes. Versions
+        are read through the local cache, so reading reference data normally costs no network round trip.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ReferenceData:
+        snapshot = self._snapshot
+
+        # Without the cache there is no way to tell whether the snapshot is current, keep serving it
+        if snapshot is not None and cache_breaker.is_open:
+            return snapshot
+
+        versions = tuple(get_cache_versions(REFERENCE_FAMILIES).values())
+        # Neither can it before the breaker opens, while the versions are placeholders
+        if snapshot is not None and (snapshot.versions == versions or any(map(is_version_unavailable, versions))):
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot.versions != versions:
+                self._snapshot = _load(versions)
+            return self._snapshot
+
+
+reference_data = ReferenceDataRegistry()
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.dispatch import receiver
+
+from apps.common.cache_warming import WARMED_FAMILIES, get_warm_targets, warm_cache_targets
+from utilities.caching import cache_invalidated
+
+# Seconds the worker waits for the rest of a burst of invalidations, so the burst is warmed once
+REWARM_DELAY = 1.0
+
+
+def _rewarm(families: set) -> None:
+    try:
+        targets = [
+            (view_class, query_params)
+            for view_class, query_params in get_warm_targets()
+            if families.intersection(view_class.get.cache_families)
+        ]
+        for _ in warm_cache_targets(targets):
+            pass
+    finally:
+        close_old_connections()
+
+
+class CacheRewarmer:
+    """
+        Single long-lived background worker rebuilding the warmed responses of invalidated families. Families
+        invalidated while it waits or works are merged and rewarmed together in its next round.
+    """
+
+    def __init__(self, rewarm=_rewarm, delay: float = REWARM_DELAY):
+        self.rewarm = rewarm
+        self.delay = delay
+        self._families = set()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, families: set) -> None:
+        with self._condition:
+            self._families.update(families)
+
+            # Started on first use, and again if a round raised and ended it
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="cache-warming", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._families)
+
+            time.sleep(self.delay)
+
+            with self._condition:
+                families, self._families = self._families, set()
+            self.rewarm(families)
+
+
+cache_rewarmer = CacheRewarmer()
+
+
+@receiver(cache_invalidated)
+def rewarm_invalidated_cache(sender, families, **kwargs):
+    """
+        Rebuild the warmed responses of the invalidated families in the background, when enabled
+        :param sender:
+        :param families:
+        :param kwargs:
+        :return:
+    """
+    if not getattr(settings, "WARM_CACHE_ON_INVALIDATION", False):
+        return None
+
+    # Most invalidations, such as a user's notifications or saved jobs, touch no warmed response
+    warmed_families = WARMED_FAMILIES.intersection(families)
+    if warmed_families:
+        cache_rewarmer.schedule(warmed_families)
@@ -1,12 +1,54 @@
+import threading
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+from uuid import uuid4
+
 import pyotp
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse_lazy, reverse
-from rest_framework.test import APITestCase
-
-
+from redis.exceptions import RedisError
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from apps.common.reference_data import reference_data, ReferenceDataRegistry
+from apps.common.signals import CacheRewarmer
+from apps.common.responses import CustomResponse
+from apps.jobs.models import JobType
+from apps.misc.models import Tip, FAQType
+from utilities.caching import clear_cache, clear_user_cache, get_cached_data, get_or_build_cached_data, \
+    make_cache_key, set_cached_data, user_cache_family, build_request_cache_key, cache_response, get_cache_versions, \
+    SCOPE_ROLE, warm_view_cache, get_or_none_cached, cache_breaker, cache_invalidated, call_cache
+from utilities.cache_codec import MsgpackCodec
+from utilities.cache_metrics import cache_metrics, key_family
+from utilities.local_cache import local_cache
+
+
+# Redis backend of the tests relying on Redis features, in a database of its own so clearing it between tests never
+# flushes the configured one
+TEST_REDIS_CACHES = {
+    "default": {
+        **settings.CACHES["default"],
+        "LOCATION": settings.CACHES["default"]["LOCATION"].rsplit("/", 1)[0] + "/15",
+        "KEY_PREFIX": "jobnest-test",
+    }
+}
+
+
+@override_settings(CACHES=TEST_REDIS_CACHES)
 class AuthTestCase(APITestCase):
 
     def setUp(self):
+        # Cached data would otherwise leak between tests, their invalidations are never committed
+        cache.clear()
+        local_cache.clear()
+
         self.user = get_user_model()
 
         self.employee_data = {
@@ -125,3 +167,401 @@ class AuthTestCase(APITestCase):
         self.tokens = tokens
         self.client.force_authenticate(user=self.user.objects.get(email=self.recruiter_data.get('email')),
                                        token=tokens.get('access'))
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CacheVersioningTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_invalidating_family_orphans_its_keys(self):
+        cache_key = make_cache_key("retrieve_jobs_", families=["retrieve_jobs", "retrieve_tips"])
+        set_cached_data(cache_key=cache_key, data=["job"], timeout=60)
+        self.assertEqual(get_cached_data(cache_key), ["job"])
+
+        # Unrelated families leave the key untouched
+        clear_cache(cache_key_prefixes=["retrieve_vacancies"])
+        self.assertEqual(make_cache_key("retrieve_jobs_", families=["retrieve_jobs", "retrieve_tips"]), cache_key)
+
+        # Any of the key's families invalidates it
+        clear_cache(cache_key_prefixes=["retrieve_tips"])
+        new_cache_key = make_cache_key("retrieve_jobs_", families=["retrieve_jobs", "retrieve_tips"])
+        self.assertNotEqual(new_cache_key, cache_key)
+        self.assertIsNone(get_cached_data(new_cache_key))
+
+    def test_user_cache_is_scoped_per_user(self):
+        first_key = make_cache_key("all_notifications_1", families=[user_cache_family(1, "all_notifications")])
+        second_key = make_cache_key("all_notifications_2", families=[user_cache_family(2, "all_notifications")])
+
+        clear_user_cache(user_id=1, pattern_string="all_notifications")
+
+        self.assertNotEqual(
+            make_cache_key("all_notifications_1", families=[user_cache_family(1, "all_notifications")]), first_key
+        )
+        self.assertEqual(
+            make_cache_key("all_notifications_2", families=[user_cache_family(2, "all_notifications")]), second_key
+        )
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class LocalCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_local_reads_skip_the_backend(self):
+        set_cached_data(cache_key="retrieve_tips", data=["tip"], timeout=60, local=True)
+        cache.delete("retrieve_tips")
+
+        self.assertEqual(get_cached_data("retrieve_tips", local=True), ["tip"])
+        self.assertIsNone(get_cached_data("retrieve_tips"))
+
+    def test_invalidation_drops_local_versions(self):
+        cache_key = make_cache_key("retrieve_tips", families=["retrieve_tips"])
+        set_cached_data(cache_key=cache_key, data=["tip"], timeout=60, local=True)
+
+        clear_cache(cache_key_prefixes=["retrieve_tips"])
+
+        new_cache_key = make_cache_key("retrieve_tips", families=["retrieve_tips"])
+        self.assertNotEqual(new_cache_key, cache_key)
+        self.assertIsNone(get_cached_data(new_cache_key, local=True))
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CacheRebuildTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.builds = []
+
+    def _build(self):
+        self.builds.append(1)
+        time.sleep(0.2)
+        return {"jobs": []}
+
+    def test_concurrent_misses_build_once(self):
+        results = []
+
+        def fetch():
+            results.append(get_or_build_cached_data(cache_key="retrieve_jobs_", build=self._build, timeout=60))
+
+        threads = [threading.Thread(target=fetch) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.builds), 1)
+        self.assertEqual(results, [{"jobs": []}] * 5)
+
+    def test_stale_data_is_served_while_rebuilding(self):
+        get_or_build_cached_data(cache_key="retrieve_jobs_:1", build=lambda: {"jobs": ["old"]}, timeout=60,
+                                 stale_key="retrieve_jobs_")
+
+        # Another worker is rebuilding the next generation
+        cache.add("rebuild_lock:retrieve_jobs_:2", "token", timeout=10)
+
+        data = get_or_build_cached_data(cache_key="retrieve_jobs_:2", build=self._build, timeout=60,
+                                        stale_key="retrieve_jobs_")
+        self.assertEqual(data, {"jobs": ["old"]})
+        self.assertEqual(self.builds, [])
+
+
+class MsgpackCodecTestCase(SimpleTestCase):
+
+    def test_round_trip_keeps_types(self):
+        codec = MsgpackCodec()
+        data = {
+            "id": uuid4(),
+            "salary": Decimal("1500.50"),
+            "interview_date": datetime(2024, 1, 5, 10, 30, tzinfo=timezone.utc),
+            "date_of_birth": date(1990, 1, 1),
+            "jobs": [{"id": uuid4(), "title": "Backend Engineer"}],
+        }
+
+        self.assertEqual(codec.loads(codec.dumps(data)), data)
+
+    def test_large_payloads_are_compressed(self):
+        codec = MsgpackCodec(compress_threshold=64)
+        data = [{"title": "Backend Engineer", "salary": Decimal("1000.00")}] * 100
+
+        payload = codec.dumps(data)
+        self.assertTrue(payload.startswith(b"z"))
+        self.assertEqual(codec.loads(payload), data)
+
+    def test_unsupported_types_fall_back_to_pickle(self):
+        codec = MsgpackCodec()
+        data = {"tags": {"remote", "contract"}}
+
+        self.assertEqual(codec.loads(codec.dumps(data)), data)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CacheMetricsTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        cache_metrics.reset()
+
+    def test_keys_are_grouped_per_family(self):
+        user_id = uuid4()
+
+        self.assertEqual(key_family("retrieve_jobs:all:d41d8cd98f00b204e9800998ecf8427e:1.2.3"), "retrieve_jobs")
+        self.assertEqual(key_family(f"saved_job_ids_{user_id}:1"), "saved_job_ids")
+        self.assertEqual(key_family(f"cache_version:filter_applied_jobs_{user_id}"),
+                         "cache_version:filter_applied_jobs")
+        self.assertEqual(key_family("throttle_anon_127.0.0.1"), "throttle_anon")
+
+    def test_hits_misses_sets_and_invalidations_are_counted(self):
+        get_cached_data("retrieve_tips:all:1")
+        set_cached_data("retrieve_tips:all:1", data=[], timeout=60)
+        get_cached_data("retrieve_tips:all:1")
+        clear_cache(cache_key_prefixes=["retrieve_tips"])
+
+        stats = next(family for family in cache_metrics.snapshot() if family["family"] == "retrieve_tips")
+        self.assertEqual((stats["hits"], stats["misses"], stats["sets"], stats["invalidations"]), (1, 1, 1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+        self.assertEqual(sum(stats["get_latency"]), 2)
+
+
+class CachedEmptyView(APIView):
+    throttle_classes = ()
+    calls = 0
+
+    @cache_response(key_prefix="test_empty", timeout=60, scope=SCOPE_ROLE)
+    def get(self, request):
+        CachedEmptyView.calls += 1
+        return CustomResponse.success(message="Retrieved successfully", data=[])
+
+
+class CachedSharedView(APIView):
+    throttle_classes = ()
+    calls = 0
+
+    @cache_response(key_prefix="test_shared", timeout=60)
+    def get(self, request):
+        CachedSharedView.calls += 1
+        return CustomResponse.success(message="Retrieved successfully", data=[])
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CacheResponseTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        CachedEmptyView.calls = 0
+        self.factory = APIRequestFactory()
+        self.employee = SimpleNamespace(id=1, company=False, is_authenticated=True)
+        self.company = SimpleNamespace(id=2, company=True, is_authenticated=True)
+
+    def _get(self, path, user):
+        request = self.factory.get(path)
+        force_authenticate(request, user=user)
+        return CachedEmptyView.as_view()(request)
+
+    def test_query_parameter_order_does_not_split_the_cache(self):
+        first_key = build_request_cache_key("retrieve_jobs", Request(self.factory.get("/?a=1&b=2")))
+        second_key = build_request_cache_key("retrieve_jobs", Request(self.factory.get("/?b=2&a=1")))
+
+        self.assertEqual(first_key, second_key)
+
+    def test_empty_results_are_cached(self):
+        self.assertEqual(self._get("/", self.employee).data["data"], [])
+        self.assertEqual(self._get("/", self.employee).data["data"], [])
+
+        self.assertEqual(CachedEmptyView.calls, 1)
+
+    def test_keys_are_scoped_per_role(self):
+        self._get("/", self.employee)
+        self._get("/", self.company)
+
+        self.assertEqual(CachedEmptyView.calls, 2)
+
+    def test_warming_rebuilds_and_caches_the_response(self):
+        CachedSharedView.calls = 0
+
+        cache_key, data = warm_view_cache(CachedSharedView)
+        self.assertEqual(data["data"], [])
+        self.assertEqual(get_cached_data(cache_key), data)
+
+        # Warming always rebuilds, even when the key is already cached
+        warm_view_cache(CachedSharedView)
+        self.assertEqual(CachedSharedView.calls, 2)
+
+    def test_matching_etags_are_answered_with_not_modified(self):
+        response = CachedSharedView.as_view()(self.factory.get("/"))
+        etag = response.headers["ETag"]
+
+        response = CachedSharedView.as_view()(self.factory.get("/", HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+
+        clear_cache(cache_key_prefixes=["test_shared"])
+        response = CachedSharedView.as_view()(self.factory.get("/", HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+
+UNREACHABLE_REDIS = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:1/1",
+        "OPTIONS": {"socket_connect_timeout": 0.05},
+    }
+}
+
+
+@override_settings(CACHE_CIRCUIT_BREAKER={"FAILURE_THRESHOLD": 2, "RESET_TIMEOUT": 60})
+class CacheOutageTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache_breaker.reset()
+        local_cache.clear()
+
+    def tearDown(self):
+        cache_breaker.reset()
+
+    def test_reads_fall_back_to_the_database_once_the_breaker_opens(self):
+        builds = []
+
+        with override_settings(CACHES=UNREACHABLE_REDIS):
+            for _ in range(3):
+                cache_key = make_cache_key("retrieve_tips:all", families=["retrieve_tips"])
+                get_or_build_cached_data(cache_key=cache_key, build=lambda: builds.append(1) or [], timeout=60)
+
+        self.assertEqual(len(builds), 3)
+        self.assertTrue(cache_breaker.is_open)
+
+    def test_a_probe_raising_another_error_does_not_keep_the_breaker_open(self):
+        def fail(error):
+            raise error
+
+        for _ in range(2):
+            call_cache(lambda: fail(RedisError()))
+        self.assertTrue(cache_breaker.is_open)
+
+        with override_settings(CACHE_CIRCUIT_BREAKER={"FAILURE_THRESHOLD": 2, "RESET_TIMEOUT": 0}):
+            with self.assertRaises(ValueError):
+                call_cache(lambda: fail(ValueError("undecodable payload")))
+
+            # The failed probe reopened the breaker, the next probe goes through and closes it
+            self.assertEqual(call_cache(lambda: "cached"), "cached")
+        self.assertFalse(cache_breaker.is_open)
+
+    @override_settings(CACHE_CIRCUIT_BREAKER={"FAILURE_THRESHOLD": 100, "RESET_TIMEOUT": 60})
+    def test_reference_data_is_not_reloaded_before_the_breaker_opens(self):
+        registry = ReferenceDataRegistry()
+
+        with override_settings(CACHES=UNREACHABLE_REDIS), \
+                mock.patch("apps.common.reference_data._load",
+                           side_effect=lambda versions: SimpleNamespace(versions=versions)) as load:
+            versions = [get_cache_versions(["retrieve_jobs"]) for _ in range(2)]
+            for _ in range(3):
+                registry.get()
+
+        self.assertFalse(cache_breaker.is_open)
+        self.assertEqual(versions[0], versions[1])
+        self.assertEqual(load.call_count, 1)
+
+    def test_invalidations_are_replayed_once_the_cache_is_back(self):
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            version = get_cache_versions(["retrieve_jobs"])["retrieve_jobs"]
+
+            with override_settings(CACHES=UNREACHABLE_REDIS):
+                clear_cache(cache_key_prefixes=["retrieve_jobs"])
+
+            self.assertEqual(get_cache_versions(["retrieve_jobs"])["retrieve_jobs"], version)
+
+            # The next invalidation that reaches the cache carries the missed one with it
+            clear_cache(cache_key_prefixes=["retrieve_tips"])
+            self.assertEqual(get_cache_versions(["retrieve_jobs"])["retrieve_jobs"], version + 1)
+
+
+class CacheRewarmTestCase(SimpleTestCase):
+
+    @override_settings(WARM_CACHE_ON_INVALIDATION=True)
+    def test_only_warmed_families_are_scheduled(self):
+        with mock.patch("apps.common.signals.cache_rewarmer") as rewarmer:
+            cache_invalidated.send(sender=None, families={"all_notifications_1", "retrieve_saved_jobs_1"})
+            rewarmer.schedule.assert_not_called()
+
+            cache_invalidated.send(sender=None, families={"all_notifications_1", "retrieve_jobs"})
+            rewarmer.schedule.assert_called_once_with(frozenset({"retrieve_jobs"}))
+
+    def test_a_burst_of_invalidations_is_rewarmed_once(self):
+        rounds = []
+        rewarmer = CacheRewarmer(rewarm=rounds.append, delay=0.05)
+
+        for families in ({"retrieve_jobs"}, {"retrieve_tips"}, {"retrieve_jobs"}):
+            rewarmer.schedule(families)
+        worker = rewarmer._thread
+
+        deadline = time.monotonic() + 2
+        while not rounds and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(rounds, [{"retrieve_jobs", "retrieve_tips"}])
+        self.assertIs(rewarmer._thread, worker)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CacheInvalidationTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+    def test_invalidations_wait_for_commit_and_are_coalesced(self):
+        version = get_cache_versions(["retrieve_jobs"])["retrieve_jobs"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clear_cache(cache_key_prefixes=["retrieve_jobs"])
+            clear_cache(cache_key_prefixes=["retrieve_jobs", "retrieve_job"])
+
+            # Nothing is invalidated before the transaction commits
+            self.assertEqual(get_cache_versions(["retrieve_jobs"])["retrieve_jobs"], version)
+
+        self.assertEqual(get_cache_versions(["retrieve_jobs"])["retrieve_jobs"], version + 1)
+
+    def test_misses_are_cached_until_the_row_is_created(self):
+        tip_id = uuid4()
+        self.assertIsNone(get_or_none_cached(Tip, id=tip_id))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_or_none_cached(Tip, id=tip_id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tip.objects.create(id=tip_id, title="Tip", description="Tip")
+
+        self.assertEqual(get_or_none_cached(Tip, id=tip_id).id, tip_id)
+
+    def test_queries_on_cached_tables_are_served_from_the_cache_until_the_table_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            FAQType.objects.create(name="General")
+
+        self.assertEqual(list(FAQType.objects.values_list('name', flat=True)), ["General"])
+        self.assertEqual(FAQType.objects.get(name="General").name, "General")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(FAQType.objects.values_list('name', flat=True)), ["General"])
+            self.assertEqual(FAQType.objects.get(name="General").name, "General")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FAQType.objects.update(name="Billing")
+
+        self.assertEqual(list(FAQType.objects.values_list('name', flat=True)), ["Billing"])
+
+    def test_reference_data_is_reloaded_only_when_its_tables_change(self):
+        self.assertEqual(reference_data.get().job_types, ())
+
+        with self.assertNumQueries(0):
+            reference_data.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job_type = JobType.objects.create(name="Remote")
+
+        self.assertEqual(reference_data.get().job_types_by_id[job_type.id].name, "Remote")
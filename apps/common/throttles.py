@@ -0,0 +1,20 @@
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+from utilities.caching import call_cache
+
+
+class FailOpenThrottleMixin:
+    """
+        Lets requests through when the cache holding the throttle history is unavailable, instead of failing them.
+    """
+
+    def allow_request(self, request, view):
+        return call_cache(lambda: super(FailOpenThrottleMixin, self).allow_request(request, view), default=True)
+
+
+class FailOpenAnonRateThrottle(FailOpenThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class FailOpenUserRateThrottle(FailOpenThrottleMixin, UserRateThrottle):
+    pass
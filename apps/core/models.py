@@ -1,10 +1,10 @@
-import pycountry
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.common.choices import COUNTRY_CHOICES
 from apps.common.models import BaseModel
 from apps.core.managers import CustomUserManager
 
@@ -55,7 +55,7 @@ class CompanyProfile(BaseModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="company_profile")
     name = models.CharField(_("Company name"), max_length=255)
     country = models.CharField(
-        max_length=255, null=True, choices=[(country.alpha_2, country.name) for country in pycountry.countries]
+        max_length=255, null=True, choices=COUNTRY_CHOICES
     )
     address = models.CharField(max_length=255, null=True, blank=True)
 
@@ -1,9 +1,9 @@
-import pycountry
 from django.contrib.auth import get_user_model
 from django.core import validators
 from django.core.validators import validate_email
 from rest_framework import serializers as sr
 
+from apps.common.choices import COUNTRY_CHOICES, COUNTRY_NAMES
 from utilities.caching import clear_user_cache
 
 User = get_user_model()
@@ -97,7 +97,7 @@ class CompanyProfileSerializer(sr.Serializer):
     user_id = sr.UUIDField(read_only=True)
     id = sr.UUIDField(read_only=True)
     name = sr.CharField()
-    country = sr.ChoiceField(choices=[(country.alpha_2, country.name) for country in pycountry.countries], default='US')
+    country = sr.ChoiceField(choices=COUNTRY_CHOICES, default='US')
     email = sr.EmailField(source="user.email", read_only=True)
     avatar = sr.ImageField(source="user.avatar")
     address = sr.CharField()
@@ -106,7 +106,7 @@ class CompanyProfileSerializer(sr.Serializer):
         data = super().to_representation(instance)
 
         if data['country'] is not None:
-            data['country'] = pycountry.countries.get(alpha_2=data['country']).name
+            data['country'] = COUNTRY_NAMES.get(data['country'])
 
         for field_name, field_value in data.items():
             if field_value is None:
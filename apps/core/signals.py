@@ -1,35 +1,54 @@
-from django.db.models.signals import post_save
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from apps.core.models import EmployeeProfile, CompanyProfile
-from utilities.caching import clear_user_cache
+from utilities.caching import clear_user_cache, clear_not_found
+
+User = get_user_model()
 
 
 @receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
 def clear_employee_profile_cache(sender, instance, **kwargs):
     """
-    Clear cache when an employee profile is created or updated
+    Clear cache when an employee profile is created, updated or deleted
     :param instance:
     :param sender:
     :param kwargs:
     :return:
     """
 
-    current_user = kwargs.get("current_user", instance.user.id)
+    current_user = kwargs.get("current_user", instance.user_id)
 
     clear_user_cache(user_id=current_user, pattern_string="employee_profile")
 
 
 @receiver(post_save, sender=CompanyProfile)
-def clear_employee_profile_cache(sender, instance, **kwargs):
+@receiver(post_delete, sender=CompanyProfile)
+def clear_company_profile_cache(sender, instance, **kwargs):
     """
-    Clear cache when an company profile is created or updated
+    Clear cache when a company profile is created, updated or deleted
     :param instance:
     :param sender:
     :param kwargs:
     :return:
     """
 
-    current_user = kwargs.get("current_user", instance.user.id)
+    current_user = kwargs.get("current_user", instance.user_id)
 
     clear_user_cache(user_id=current_user, pattern_string="company_profile")
+
+
+@receiver(post_save, sender=User)
+def clear_user_not_found_cache(sender, instance, created, **kwargs):
+    """
+    Forget cached misses for a user once they are created
+    :param instance:
+    :param sender:
+    :param created:
+    :param kwargs:
+    :return:
+    """
+    if created:
+        clear_not_found(User, id=instance.id)
@@ -261,7 +261,8 @@ class CoreTestCase(AuthTestCase):
 
         # Test the error by deleting the employee profile
         employee_profile = self.user.objects.get().employee_profile
-        employee_profile.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            employee_profile.delete()
 
         response = self.client.get(self.employee_profile_methods_url)
         self.assertEqual(response.status_code, 404)
@@ -290,7 +291,8 @@ class CoreTestCase(AuthTestCase):
 
         # Test the error by deleting the employee profile
         company_profile = self.user.objects.get().company_profile
-        company_profile.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            company_profile.delete()
 
         response = self.client.get(self.company_profile_methods_url)
         self.assertEqual(response.status_code, 404)
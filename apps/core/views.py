@@ -17,7 +17,7 @@ from apps.core.selectors import *
 from apps.core.serializers import *
 from apps.notification.choices import NOTIFICATION_PROFILE_UPDATED
 from apps.notification.models import Notification
-from utilities.caching import get_cached_data, set_cached_data
+from utilities.caching import cache_response, user_family, SCOPE_USER
 from utilities.encryption import decrypt_token_to_profile, encrypt_profile_to_token
 
 User = get_user_model()
@@ -353,21 +353,14 @@ class RetrieveUpdateDeleteEmployeeProfileView(APIView):
     serializer_class = EmployeeProfileSerializer
 
     @retrieve_employee_profile_docs()
+    @cache_response(key_prefix="employee_profile", timeout=60 * 60 * 24, scope=SCOPE_USER,
+                    families=[user_family("employee_profile")])
     def get(self, request):
         user = request.user
 
-        cache_key = f"employee_profile_{user.id}"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        if cached_data:
-            return CustomResponse.success(message="Retrieved profile successfully", data=cached_data)
-
         profile_instance = get_employee_profile(user=user)
 
         serialized_data = self.serializer_class(profile_instance, context={"request": request}).data
-
-        # Set cache data
-        set_cached_data(cache_key, serialized_data, timeout=60 * 60 * 24)
         return CustomResponse.success(message="Retrieved profile successfully", data=serialized_data)
 
     @update_employee_profile_docs()
@@ -404,21 +397,14 @@ class RetrieveUpdateDeleteCompanyProfileView(APIView):
     serializer_class = CompanyProfileSerializer
 
     @retrieve_company_profile_docs()
+    @cache_response(key_prefix="company_profile", timeout=60 * 60 * 24, scope=SCOPE_USER,
+                    families=[user_family("company_profile")])
     def get(self, request):
         user = request.user
 
-        cache_key = f"company_profile_{user.id}"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        if cached_data:
-            return CustomResponse.success(message="Retrieved profile successfully", data=cached_data)
-
         profile_instance = get_company_profile(user=user)
 
         serialized_data = self.serializer_class(profile_instance, context={"request": request}).data
-
-        # Set cache data
-        set_cached_data(cache_key, serialized_data, timeout=60 * 60 * 24)
         return CustomResponse.success(message="Retrieved profile successfully", data=serialized_data)
 
     @update_company_profile_docs()
@@ -77,6 +77,13 @@ class JobAdmin(admin.ModelAdmin):
     def recruiter_name(self, obj):
         return obj.recruiter.company_profile.name
 
+    def save_model(self, request, obj, form, change):
+        # Only the edited fields are written, the counters are kept up to date by atomic updates
+        if change:
+            obj.save(update_fields=[*form.changed_data, "updated"])
+        else:
+            super().save_model(request, obj, form, change)
+
 
 @admin.register(AppliedJob)
 class AppliedJobAdmin(admin.ModelAdmin):
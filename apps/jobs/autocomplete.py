@@ -0,0 +1,163 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from apps.core.models import CompanyProfile
+from apps.jobs.models import Job, JobType
+from utilities.caching import call_cache, REBUILD_LOCK_TIMEOUT
+from utilities.local_cache import get_redis_client
+
+AUTOCOMPLETE_KEY = "autocomplete"
+AUTOCOMPLETE_LIMIT = 10
+
+SUGGESTION_TITLE = "title"
+SUGGESTION_COMPANY = "company"
+SUGGESTION_JOB_TYPE = "job_type"
+
+# Marks a built index, so an empty index is told apart from a missing or evicted one
+BUILT_MARKER = b""
+
+# Separates the lowercased text, the kind and the text as displayed in an index member
+SEPARATOR = "\x00"
+
+# Where every kind of suggestion comes from: the model, the rows that count and the field holding the text
+SUGGESTION_SOURCES = {
+    SUGGESTION_TITLE: (Job, {"active": True}, "title"),
+    SUGGESTION_COMPANY: (CompanyProfile, {}, "name"),
+    SUGGESTION_JOB_TYPE: (JobType, {}, "name"),
+}
+
+SUGGESTION_KINDS = {model: kind for kind, (model, _, _) in SUGGESTION_SOURCES.items()}
+
+
+def _source_texts(kind: str, lookup: str = None, value=None):
+    """
+        Distinct texts of one kind of suggestion, optionally narrowed down with a lookup on the text field.
+    """
+    model, filters, field = SUGGESTION_SOURCES[kind]
+    queryset = model.objects.filter(**filters)
+
+    if lookup is not None:
+        queryset = queryset.filter(**{f"{field}__{lookup}": value})
+    return queryset.order_by().values_list(field, flat=True).distinct()
+
+
+def _member(kind: str, text: str) -> bytes:
+    return SEPARATOR.join([text.casefold(), kind, text]).encode()
+
+
+def _parse_member(member: bytes) -> dict:
+    _, kind, text = member.decode().split(SEPARATOR, 2)
+    return {"text": text, "kind": kind}
+
+
+def _index_key() -> str:
+    return cache.make_and_validate_key(AUTOCOMPLETE_KEY)
+
+
+def build_autocomplete_index(client) -> None:
+    """
+        Replace the index with every current suggestion, in one transaction.
+    """
+    members = {BUILT_MARKER: 0}
+    for kind in SUGGESTION_SOURCES:
+        members.update({_member(kind, text): 0 for text in _source_texts(kind) if text})
+
+    with client.pipeline(transaction=True) as pipeline:
+        pipeline.delete(_index_key())
+        pipeline.zadd(_index_key(), members)
+        pipeline.execute()
+
+
+def _build_once(client) -> bool:
+    """
+        Build the missing index unless another worker already is, with the same lock as cached data rebuilds.
+
+        :return: Whether the index was built.
+    """
+    lock_key = f"rebuild_lock:{AUTOCOMPLETE_KEY}"
+    lock_token = uuid4().hex
+
+    if not cache.add(lock_key, lock_token, timeout=REBUILD_LOCK_TIMEOUT):
+        return False
+
+    try:
+        build_autocomplete_index(client)
+    finally:
+        if cache.get(lock_key) == lock_token:
+            cache.delete(lock_key)
+    return True
+
+
+def _lookup(client, prefix: str, limit: int):
+    start = prefix.casefold().encode()
+    # UTF-8 never produces 0xff, so it sorts after every member starting with the prefix
+    members = client.zrangebylex(_index_key(), b"[" + start, b"[" + start + b"\xff", start=0, num=limit)
+
+    if not members and not client.exists(_index_key()):
+        # While another worker builds the index, answer from the database
+        if not _build_once(client):
+            return None
+        members = client.zrangebylex(_index_key(), b"[" + start, b"[" + start + b"\xff", start=0, num=limit)
+    return [_parse_member(member) for member in members]
+
+
+def _query_suggestions(prefix: str, limit: int) -> list:
+    suggestions = []
+    for kind in SUGGESTION_SOURCES:
+        texts = _source_texts(kind, "istartswith", prefix)[:limit]
+        suggestions += [{"text": text, "kind": kind} for text in texts]
+
+    return sorted(suggestions, key=lambda suggestion: suggestion["text"].casefold())[:limit]
+
+
+def get_autocomplete_suggestions(prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> list:
+    """
+        Job titles, company names and job type names starting with the prefix, in alphabetical order.
+
+        :param prefix: What the user has typed so far.
+        :param limit: Maximum number of suggestions.
+        :return: Suggestions, each with its text and kind.
+    """
+    prefix = prefix.strip()
+    if not prefix:
+        return []
+
+    client = get_redis_client()
+    suggestions = None if client is None else call_cache(lambda: _lookup(client, prefix, limit))
+
+    # Without the index, or while it is being built, answer from the database
+    if suggestions is None:
+        suggestions = _query_suggestions(prefix, limit)
+    return suggestions
+
+
+def refresh_autocomplete_suggestions(kind: str, texts: set) -> None:
+    """
+        Add or remove suggestions of one kind depending on whether the database still has them. Called once the
+        transaction changing them commits, so the index is never ahead of the database.
+
+        :param kind: Kind of the suggestions.
+        :param texts: Texts that may have appeared or disappeared.
+    """
+    client = get_redis_client()
+    texts = {text for text in texts if text}
+    if client is None or not texts:
+        return
+
+    current = set(_source_texts(kind, "in", texts))
+
+    def update():
+        # A missing index is built in full on the next lookup
+        if not client.exists(_index_key()):
+            return
+
+        with client.pipeline(transaction=False) as pipeline:
+            for text in texts:
+                if text in current:
+                    pipeline.zadd(_index_key(), {_member(kind, text): 0})
+                else:
+                    pipeline.zrem(_index_key(), _member(kind, text))
+            pipeline.execute()
+
+    call_cache(update)
@@ -1,8 +1,8 @@
-import pycountry
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiResponse, OpenApiExample, OpenApiParameter, extend_schema
 from rest_framework import status
 
+from apps.common.choices import COUNTRY_NAMES
 from apps.jobs.choices import STATUS_CHOICES
 from apps.jobs.models import JobType
 
@@ -42,10 +42,13 @@ def search_jobs_docs():
     return extend_schema(
         summary="Search jobs",
         parameters=[
-            OpenApiParameter(name="search", type=OpenApiTypes.STR)
+            OpenApiParameter(name="search", type=OpenApiTypes.STR),
+            OpenApiParameter(name="page", type=OpenApiTypes.INT, required=False),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
         ],
         description="""
-        This endpoint allows an authenticated job seeker to search for jobs
+        This endpoint allows an authenticated job seeker to search for jobs by title, company and job type. Results are
+        ordered by relevance and paginated.
         """,
         tags=['Job Seeker Home'],
         responses={
@@ -58,32 +61,78 @@ def search_jobs_docs():
                         value={
                             "status": "success",
                             "message": "Successfully retrieved searched jobs",
+                            "data": {
+                                "per_page": 30,
+                                "current_page": 1,
+                                "last_page": 1,
+                                "items": [
+                                    {
+                                        "id": "ee33b210-93c0-46c6-abea-58841db8dec9",
+                                        "title": "Backend Engineer",
+                                        "recruiter": {
+                                            "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
+                                            "name": "Amazon",
+                                        },
+                                        "job_image": "/media/static/jobs/Screenshot_from_2024-07-01_10-55-13.png",
+                                        "location": "Burundi",
+                                        "type": "Software",
+                                        "salary": 500000,
+                                        "applications_count": 12,
+                                        "is_saved": False
+                                    },
+                                    {
+                                        "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
+                                        "title": "Software Developer",
+                                        "recruiter": {
+                                            "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
+                                            "name": "Apple",
+                                        },
+                                        "job_image": "/media/static/jobs/Screenshot_from_2024-07-01_06-53-03.png",
+                                        "location": "Åland Islands",
+                                        "type": "Software",
+                                        "salary": 20000,
+                                        "applications_count": 12,
+                                        "is_saved": False
+                                    }
+                                ]
+                            }
+                        }
+                    )
+                ]
+            )
+        }
+    )
+
+
+def autocomplete_docs():
+    return extend_schema(
+        summary="Autocomplete job searches",
+        parameters=[
+            OpenApiParameter(name="q", type=OpenApiTypes.STR, description="What the user has typed so far"),
+        ],
+        description="""
+        This endpoint allows an authenticated job seeker to get job titles, company names and job types starting with
+        what they have typed, to complete a search as they type
+        """,
+        tags=['Job Seeker Home'],
+        responses={
+            status.HTTP_200_OK: OpenApiResponse(
+                response={"application/json"},
+                description="Successfully retrieved suggestions",
+                examples=[
+                    OpenApiExample(
+                        name="Success Response",
+                        value={
+                            "status": "success",
+                            "message": "Successfully retrieved suggestions",
                             "data": [
                                 {
-                                    "id": "ee33b210-93c0-46c6-abea-58841db8dec9",
-                                    "title": "Backend Engineer",
-                                    "recruiter": {
-                                        "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
-                                        "name": "Amazon",
-                                    },
-                                    "job_image": "/media/static/jobs/Screenshot_from_2024-07-01_10-55-13.png",
-                                    "location": "Burundi",
-                                    "type": "Software",
-                                    "salary": 500000,
-                                    "is_saved": False
+                                    "text": "Software",
+                                    "kind": "job_type"
                                 },
                                 {
-                                    "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
-                                    "title": "Software Developer",
-                                    "recruiter": {
-                                        "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
-                                        "name": "Apple",
-                                    },
-                                    "job_image": "/media/static/jobs/Screenshot_from_2024-07-01_06-53-03.png",
-                                    "location": "Åland Islands",
-                                    "type": "Software",
-                                    "salary": 20000,
-                                    "is_saved": False
+                                    "text": "Software Developer",
+                                    "kind": "title"
                                 }
                             ]
                         }
@@ -107,14 +156,17 @@ def job_home_docs():
                              enum=JobType.objects.values_list('name', flat=True)),
 
             OpenApiParameter('location', type=OpenApiTypes.STR,
-                             description="Filter jobs by location: Pass in the countries alpha 2 to get the result",
-                             enum=[country.alpha_2 for country in pycountry.countries]),
+                             description="Filter jobs by location: Pass in a country name, the start of one, a common "
+                                         "alias like UK or USA, or its alpha 2 or alpha 3 code"),
 
             OpenApiParameter('salary_min', type=OpenApiTypes.FLOAT,
                              description="Filter jobs by salary"),
 
             OpenApiParameter('salary_max', type=OpenApiTypes.FLOAT,
                              description="Filter jobs by salary"),
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, required=False,
+                             description="next_cursor of the previous page"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
         ],
         tags=["Job Seeker Home"],
         responses={
@@ -164,6 +216,7 @@ def job_home_docs():
                                         "location": "Burundi",
                                         "type": "Software",
                                         "salary": 500000,
+                                        "applications_count": 12,
                                         "is_saved": False
                                     },
                                     {
@@ -177,6 +230,7 @@ def job_home_docs():
                                         "location": "Åland Islands",
                                         "type": "Software",
                                         "salary": 20000,
+                                        "applications_count": 12,
                                         "is_saved": False
                                     }
                                 ]
@@ -219,6 +273,7 @@ def job_details_docs():
                                 "location": "Åland Islands",
                                 "type": "Software",
                                 "salary": 20000,
+                                "applications_count": 12,
                                 "is_saved": False,
                                 "requirements": [
                                     {
@@ -341,7 +396,10 @@ def applied_jobs_search_docs():
     return extend_schema(
         summary="Search applied jobs",
         parameters=[
-            OpenApiParameter(name="search", type=OpenApiTypes.STR, required=False)
+            OpenApiParameter(name="search", type=OpenApiTypes.STR, required=False),
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, required=False,
+                             description="next_cursor of the previous page"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
         ],
         description=(
             """
@@ -457,6 +515,9 @@ def filter_applied_jobs_docs():
         parameters=[
             OpenApiParameter('status', type=OpenApiTypes.STR, description="Filter jobs by type",
                              enum=[choice[0] for choice in STATUS_CHOICES]),
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, required=False,
+                             description="next_cursor of the previous page"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
         ],
         tags=["Job (Seeker)"],
         responses={
@@ -613,6 +674,11 @@ def retrieve_all_saved_jobs_docs():
             `P.S`: Use the job id to get the details of the job using the job details endpoint.
             """
         ),
+        parameters=[
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, required=False,
+                             description="next_cursor of the previous page"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
+        ],
         tags=["Job (Seeker)"],
         responses={
             status.HTTP_200_OK: OpenApiResponse(
@@ -654,10 +720,13 @@ def search_vacancies_docs():
     return extend_schema(
         summary="Search jobs",
         parameters=[
-            OpenApiParameter(name="search", type=OpenApiTypes.STR, required=False)
+            OpenApiParameter(name="search", type=OpenApiTypes.STR, required=False),
+            OpenApiParameter(name="page", type=OpenApiTypes.INT, required=False),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
         ],
         description="""
-        This endpoint allows an authenticated job recruiter to search for his posted vacancies
+        This endpoint allows an authenticated job recruiter to search for his posted vacancies by title, company and
+        job type. Results are ordered by relevance and paginated.
         """,
         tags=['Job Recruiter Home'],
         responses={
@@ -670,34 +739,43 @@ def search_vacancies_docs():
                         value={
                             "status": "success",
                             "message": "Successfully retrieved searched vacancies",
-                            "data": [
-                                {
-                                    "id": "ee33b210-93c0-46c6-abea-58841db8dec9",
-                                    "title": "Backend Engineer",
-                                    "recruiter": {
-                                        "id": "eced692c-b5fe-4ebb-b4ca-7faacc0bbc7a",
-                                        "full_name": "Amazon"
-                                    },
-                                    "job_image": "/media/static/jobs/Screenshot_from_2024-07-01_10-55-13.png",
-                                    "location": "Burundi",
-                                    "type": "Software",
-                                    "salary": 500000,
-                                    "active": True
-                                },
-                                {
-                                    "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
-                                    "title": "Software Developer",
-                                    "recruiter": {
-                                        "id": "eced692c-b5fe-4ebb-b4ca-7faacc0bbc7a",
-                                        "full_name": "Amazon"
+                            "data": {
+                                "per_page": 30,
+                                "current_page": 1,
+                                "last_page": 1,
+                                "items": [
+                                    {
+                                        "id": "ee33b210-93c0-46c6-abea-58841db8dec9",
+                                        "title": "Backend Engineer",
+                                        "recruiter": {
+                                            "id": "eced692c-b5fe-4ebb-b4ca-7faacc0bbc7a",
+                                            "full_name": "Amazon"
+                                        },
+                                        "job_image": "/media/static/jobs/Screenshot_from_2024-07-01_10-55-13.png",
+                                        "location": "Burundi",
+                                        "type": "Software",
+                                        "salary": 500000,
+                                        "active": True,
+                                        "applications_count": 12,
+                                        "saves_count": 30
                                     },
-                                    "job_image": "/media/static/jobs/Screenshot_from_2024-07-01_06-53-03.png",
-                                    "location": "Åland Islands",
-                                    "type": "Software",
-                                    "salary": 20000,
-                                    "active": True
-                                }
-                            ]
+                                    {
+                                        "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
+                                        "title": "Software Developer",
+                                        "recruiter": {
+                                            "id": "eced692c-b5fe-4ebb-b4ca-7faacc0bbc7a",
+                                            "full_name": "Amazon"
+                                        },
+                                        "job_image": "/media/static/jobs/Screenshot_from_2024-07-01_06-53-03.png",
+                                        "location": "Åland Islands",
+                                        "type": "Software",
+                                        "salary": 20000,
+                                        "active": True,
+                                        "applications_count": 12,
+                                        "saves_count": 30
+                                    }
+                                ]
+                            }
                         }
                     )
                 ]
@@ -714,6 +792,9 @@ def vacancies_home_docs():
         """,
         parameters=[
             OpenApiParameter('active', type=OpenApiTypes.BOOL, description="Filter jobs by active"),
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, required=False,
+                             description="next_cursor of the previous page"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
         ],
         tags=["Job Recruiter Home"],
         responses={
@@ -737,7 +818,9 @@ def vacancies_home_docs():
                                         "location": "Burundi",
                                         "type": "Software",
                                         "salary": 500000,
-                                        "active": True
+                                        "active": True,
+                                        "applications_count": 12,
+                                        "saves_count": 30
                                     },
                                     {
                                         "id": "9bed0097-7c05-4849-8cfb-b4d28ccaf9c0",
@@ -747,7 +830,9 @@ def vacancies_home_docs():
                                         "location": "Åland Islands",
                                         "type": "Software",
                                         "salary": 20000,
-                                        "active": True
+                                        "active": True,
+                                        "applications_count": 12,
+                                        "saves_count": 30
                                     }
                                 ],
                                 "all_applied_applicants": [
@@ -839,7 +924,7 @@ def create_vacancies_docs():
                     },
                     'location': {
                         'type': 'string',
-                        'enum': [country.alpha_2 for country in pycountry.countries],
+                        'enum': list(COUNTRY_NAMES),
                         'description': 'Location of the job',
                     },
                     'type': {
@@ -906,6 +991,7 @@ def update_vacancy_docs():
             """
             This endpoint allows an authenticated job recruiter to update a job, pass in the id as the path parameter
             If an id is not passed as part of the requirements payload, it's get treated as a new requirement so the requirement gets created
+            The requirements payload replaces the job's requirements, the existing ones not passed in it get deleted
             """
         ),
         tags=['Job (Recruiter)'],
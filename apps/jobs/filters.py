@@ -1,18 +1,27 @@
 from django_filters import FilterSet, filters
 
+from apps.common.locations import resolve_location
+from apps.common.reference_data import reference_data
 from apps.jobs.choices import STATUS_CHOICES
-from apps.jobs.models import JobType
 
 
 class JobFilter(FilterSet):
     type = filters.ChoiceFilter(
-        field_name='type__name',
-        lookup_expr='icontains',
-        choices=lambda: [(type_obj.name, type_obj.name) for type_obj in JobType.objects.all()]
+        method='filter_type',
+        choices=lambda: [(name, name) for name in reference_data.get().job_type_ids_by_name]
     )
     salary_min = filters.NumberFilter(field_name='salary', lookup_expr='gte')
     salary_max = filters.NumberFilter(field_name='salary', lookup_expr='lte')
-    location = filters.CharFilter(field_name='location', lookup_expr='icontains')
+    location = filters.CharFilter(method='filter_location')
+
+    def filter_type(self, queryset, name, value):
+        # The name is resolved to the ids of its types up front so the lookup can use the job type feed index. A
+        # type renamed or deleted since the choice was validated matches no job.
+        return queryset.filter(type_id__in=reference_data.get().job_type_ids_by_name.get(value, ()))
+
+    def filter_location(self, queryset, name, value):
+        # Country names, aliases and codes are resolved up front so the lookup can use the location index
+        return queryset.filter(location__in=resolve_location(value))
 
 
 class AppliedJobFilter(FilterSet):
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.jobs.models import Job, JOB_COUNTERS
+
+BATCH_SIZE = 1000
+
+
+def count_rows(model) -> Coalesce:
+    """
+        Number of rows of the model pointing at the outer job.
+    """
+    rows = model.objects.filter(job=OuterRef('pk')).order_by()
+    return Coalesce(Subquery(rows.values('job').annotate(count=Count('pk')).values('count')), 0)
+
+
+class Command(BaseCommand):
+    help = 'Recounts the applications and saves of every job and repairs the counters that drifted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Number of jobs checked per query.')
+
+    def handle(self, *args, **options):
+        counts = {counter: count_rows(model) for model, counter in JOB_COUNTERS.items()}
+        drifted = Q()
+        for counter in counts:
+            drifted |= ~Q(**{counter: F(f"actual_{counter}")})
+
+        checked = repaired = 0
+        last_id = None
+
+        while True:
+            # Jobs are walked in primary key order, one batch at a time
+            batch = Job.objects.order_by('pk')
+            if last_id is not None:
+                batch = batch.filter(pk__gt=last_id)
+            job_ids = list(batch.values_list('pk', flat=True)[:options['batch_size']])
+            if not job_ids:
+                break
+
+            drifted_ids = list(
+                Job.objects.filter(pk__in=job_ids).annotate(
+                    **{f"actual_{counter}": count for counter, count in counts.items()}
+                ).filter(drifted).values_list('pk', flat=True)
+            )
+            # Recounted in the update itself, so rows added since the check are not missed
+            if drifted_ids:
+                repaired += Job.objects.filter(pk__in=drifted_ids).update(**counts)
+
+            checked += len(job_ids)
+            last_id = job_ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} jobs, repaired {repaired}."))
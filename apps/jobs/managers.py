@@ -1,10 +1,31 @@
 from django.db import models
+from django.db.models import Exists, OuterRef
+
+# Columns the job listings read, the type name and the recruiter's company profile are joined in
+JOB_LISTING_FIELDS = (
+    'title', 'image', 'salary', 'location', 'active', 'created', 'applications_count', 'saves_count',
+    'type__name', 'recruiter__company_profile__name',
+)
 
 
 class BaseManager(models.Manager):
+    # Extra relations and columns listings of the model read, on top of the job's listing columns
+    listing_related = ()
+    listing_fields = ()
+
     def get_queryset(self):
         return super().get_queryset().select_related('job', 'user')
 
+    def for_listing(self):
+        """
+            Rows with their job, the job's type and recruiter company profile joined, loading only the columns
+            listings read.
+        """
+        job_fields = [f"job__{field}" for field in JOB_LISTING_FIELDS]
+        return self.get_queryset().select_related(
+            'job__type', 'job__recruiter__company_profile', *self.listing_related
+        ).only('job', 'user', 'created', *job_fields, *self.listing_fields)
+
     def get_or_none(self, **kwargs):
         try:
             return self.get(**kwargs)
@@ -14,10 +35,24 @@ class BaseManager(models.Manager):
 
 class JobManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().select_related('type', 'recruiter')
+        # The search vector is only read by the database
+        return super().get_queryset().select_related('type', 'recruiter').defer('search_vector')
+
+    def for_listing(self):
+        """
+            Jobs with their type and recruiter company profile joined, loading only the columns listings read.
+        """
+        return self.get_queryset().select_related('recruiter__company_profile').only(*JOB_LISTING_FIELDS)
 
     def get_active_jobs(self):
-        return self.get_queryset().filter(active=True).order_by('-created')
+        return self.for_listing().filter(active=True).order_by('-created')
+
+    def with_saved_state(self, user):
+        """
+            Jobs annotated with is_saved, telling whether the user saved them, in the same query.
+        """
+        saved_jobs = self.model.saved_jobs.field.model.objects.filter(job=OuterRef('pk'), user=user)
+        return self.for_listing().annotate(is_saved=Exists(saved_jobs))
 
     def get_or_none(self, **kwargs):
         try:
@@ -27,7 +62,8 @@ class JobManager(models.Manager):
 
 
 class AppliedJobManager(BaseManager):
-    pass  # Inherits from BaseManager with default behavior
+    listing_related = ('user__employee_profile',)
+    listing_fields = ('cv', 'review', 'status', 'interview_date', 'user__employee_profile__full_name')
 
 
 class SavedJobManager(BaseManager):
@@ -0,0 +1,64 @@
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.db import migrations
+
+POSTGRES_INDEX_NAME = "jobs_job_search_vector_gin"
+
+
+def create_search_index(apps, schema_editor):
+    """
+        Build the full-text index of the database engine in use from the existing jobs.
+    """
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        Job = apps.get_model("jobs", "Job")
+        schema_editor.add_index(Job, GinIndex(fields=["search_vector"], name=POSTGRES_INDEX_NAME))
+        schema_editor.execute(
+            """
+            UPDATE jobs_job SET search_vector =
+                setweight(to_tsvector('english', jobs_job.title), 'A') ||
+                setweight(to_tsvector('english', coalesce(core_companyprofile.name, '')), 'B') ||
+                setweight(to_tsvector('english', jobs_jobtype.name), 'C')
+            FROM jobs_jobtype, core_user
+            LEFT JOIN core_companyprofile ON core_companyprofile.user_id = core_user.id
+            WHERE jobs_jobtype.id = jobs_job.type_id AND core_user.id = jobs_job.recruiter_id
+            """
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute("CREATE VIRTUAL TABLE jobs_job_search USING fts5(job_id UNINDEXED, title, company, type)")
+        schema_editor.execute(
+            """
+            INSERT INTO jobs_job_search (job_id, title, company, type)
+            SELECT jobs_job.id, jobs_job.title, core_companyprofile.name, jobs_jobtype.name
+            FROM jobs_job
+            INNER JOIN jobs_jobtype ON jobs_jobtype.id = jobs_job.type_id
+            LEFT JOIN core_companyprofile ON core_companyprofile.user_id = jobs_job.recruiter_id
+            """
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        Job = apps.get_model("jobs", "Job")
+        schema_editor.remove_index(Job, GinIndex(fields=["search_vector"], name=POSTGRES_INDEX_NAME))
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE jobs_job_search")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('core', '0002_remove_user_is_active_delete_otpsecret'),
+        ('jobs', '0003_remove_job_is_saved'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.4 on 2026-10-17 04:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appliedjob',
+            index=models.Index(fields=['user', 'status', '-created', '-id'], name='appliedjob_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appliedjob',
+            index=models.Index(fields=['user', '-created', '-id'], name='appliedjob_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('active', True)), fields=['-created', '-id'], name='job_active_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('active', True)), fields=['type', '-created', '-id'], name='job_type_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('active', True)), fields=['location', '-created', '-id'], name='job_location_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['recruiter', '-created', '-id'], name='job_recruiter_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedjob',
+            index=models.Index(fields=['user', '-created', '-id'], name='savedjob_user_created_idx'),
+        ),
+    ]
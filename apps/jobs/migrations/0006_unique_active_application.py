@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-17 04:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_applications(apps, schema_editor):
+    """
+        Keep the first of the active applications a user sent to the same job, the rest came from repeated taps on
+        apply and would break the constraint.
+    """
+    AppliedJob = apps.get_model("jobs", "AppliedJob")
+    seen = set()
+    duplicates = []
+
+    applications = AppliedJob.objects.exclude(status="REJECTED").order_by("created").values_list("id", "user_id",
+                                                                                                "job_id")
+    for application_id, user_id, job_id in applications.iterator():
+        if (user_id, job_id) in seen:
+            duplicates.append(application_id)
+        seen.add((user_id, job_id))
+
+    AppliedJob.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_applications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appliedjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'REJECTED'), _negated=True), fields=('user', 'job'), name='unique_active_application'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.4 on 2026-10-17 04:29
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_job_activity(apps, schema_editor):
+    """
+        Set the counters of the existing jobs from their applications and saves.
+    """
+    Job = apps.get_model("jobs", "Job")
+    counts = {}
+
+    for counter, model_name in (("applications_count", "AppliedJob"), ("saves_count", "SavedJob")):
+        rows = apps.get_model("jobs", model_name).objects.filter(job=OuterRef("pk")).order_by()
+        counts[counter] = Coalesce(Subquery(rows.values("job").annotate(count=Count("pk")).values("count")), 0)
+
+    Job.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_unique_active_application'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='saves_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_job_activity, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,15 @@
-import pycountry
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import FileExtensionValidator
 from django.db import models
+from django.db.models import Q
 from django.urls import reverse
 
+from apps.common.choices import COUNTRY_CHOICES
 from apps.common.models import BaseModel
-from apps.jobs.choices import STATUS_CHOICES, STATUS_PENDING
+from apps.jobs.choices import STATUS_CHOICES, STATUS_PENDING, STATUS_REJECTED
 from apps.jobs.managers import JobManager, AppliedJobManager, SavedJobManager
+from utilities.query_cache import CachedManager
 
 User = get_user_model()
 
@@ -16,6 +19,8 @@ User = get_user_model()
 class JobType(BaseModel):
     name = models.CharField(max_length=255)
 
+    objects = CachedManager()
+
     def __str__(self):
         return self.name
 
@@ -27,12 +32,29 @@ class Job(BaseModel):
     salary = models.DecimalField(max_digits=10, decimal_places=2)
     type = models.ForeignKey(JobType, on_delete=models.CASCADE, related_name="jobs")
     location = models.CharField(
-        max_length=255, null=True, choices=[(country.alpha_2, country.name) for country in pycountry.countries],
+        max_length=255, null=True, choices=COUNTRY_CHOICES,
     )
     active = models.BooleanField(default=True)
+    # Only moved by atomic F() updates in apps/jobs/signals.py. Save a loaded job with explicit update_fields so
+    # counts that moved on since it was loaded are not written back.
+    applications_count = models.PositiveIntegerField(default=0, editable=False)
+    saves_count = models.PositiveIntegerField(default=0, editable=False)
+    # Weighted title, company and type vector, only maintained on PostgreSQL, see apps/jobs/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = JobManager()
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            # Job seeker feed, newest active jobs first, optionally narrowed down to a job type or locations
+            models.Index(fields=['-created', '-id'], condition=Q(active=True), name='job_active_feed_idx'),
+            models.Index(fields=['type', '-created', '-id'], condition=Q(active=True), name='job_type_feed_idx'),
+            models.Index(fields=['location', '-created', '-id'], condition=Q(active=True),
+                         name='job_location_feed_idx'),
+            # Recruiter vacancies, newest first
+            models.Index(fields=['recruiter', '-created', '-id'], name='job_recruiter_created_idx'),
+        ]
+
     @property
     def image_url(self):
         return self.image.url if self.image else ""
@@ -67,6 +89,10 @@ class SavedJob(BaseModel):
                 fields=["user", "job"], name="unique_user_job"
             )
         ]
+        indexes = [
+            # Saved jobs of a user, newest first
+            models.Index(fields=['user', '-created', '-id'], name='savedjob_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} > {self.job.title}"
@@ -85,5 +111,22 @@ class AppliedJob(BaseModel):
 
     objects = AppliedJobManager()
 
+    class Meta(BaseModel.Meta):
+        constraints = [
+            # A user has one application to a job at a time, a rejected one can be applied again
+            models.UniqueConstraint(
+                fields=["user", "job"], condition=~Q(status=STATUS_REJECTED), name="unique_active_application"
+            )
+        ]
+        indexes = [
+            # Applications of a user, filtered by status or newest first
+            models.Index(fields=['user', 'status', '-created', '-id'], name='appliedjob_user_status_idx'),
+            models.Index(fields=['user', '-created', '-id'], name='appliedjob_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.email} applied for {self.job.title}"
+
+
+# Job counter of the rows of each model
+JOB_COUNTERS = {AppliedJob: "applications_count", SavedJob: "saves_count"}
@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, OuterRef, Q, QuerySet, Subquery, Value, FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from apps.core.models import CompanyProfile
+from apps.jobs.models import Job, JobType
+
+# Text search configuration of the PostgreSQL search vector
+SEARCH_CONFIG = "english"
+
+# Table of the SQLite full-text index, created by the 0004_job_search migration
+FTS_TABLE = "jobs_job_search"
+
+# Relevance of a match in each field, title first, then company name, then job type
+SEARCH_WEIGHTS = {"title": 1.0, "company": 0.5, "type": 0.25}
+
+# Job fields the search index is built from
+INDEXED_FIELDS = frozenset({"title", "recruiter", "type"})
+
+
+def search_terms(query: str) -> list:
+    """
+        Split a search query into words, dropping everything the full-text query syntaxes would interpret.
+    """
+    return re.findall(r"\w+", query or "")
+
+
+class SimpleSearchBackend:
+    """
+        Unranked substring search, for databases without a full-text backend.
+    """
+
+    def index_jobs(self, queryset: QuerySet) -> None:
+        pass
+
+    def remove_job(self, job_id) -> None:
+        pass
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        condition = Q()
+        for term in search_terms(query):
+            condition &= (
+                Q(title__icontains=term) | Q(type__name__icontains=term) |
+                Q(recruiter__company_profile__name__icontains=term)
+            )
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField())).order_by(
+            '-created')
+
+
+class PostgresSearchBackend:
+    """
+        Ranks jobs against Job.search_vector, a weighted tsvector of the title, company name and job type name
+        stored on the row and covered by a GIN index.
+    """
+
+    def index_jobs(self, queryset: QuerySet) -> None:
+        company_name = CompanyProfile.objects.filter(user=OuterRef('recruiter')).order_by().values('name')[:1]
+        type_name = JobType.objects.filter(pk=OuterRef('type')).order_by().values('name')[:1]
+
+        queryset.update(
+            search_vector=(
+                SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+                SearchVector(Subquery(company_name), weight='B', config=SEARCH_CONFIG) +
+                SearchVector(Subquery(type_name), weight='C', config=SEARCH_CONFIG)
+            )
+        )
+
+    def remove_job(self, job_id) -> None:
+        # The vector is deleted with its row
+        pass
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        terms = search_terms(query)
+        if not terms:
+            return SimpleSearchBackend().search(queryset, query)
+
+        # Every word has to match, the last one may be incomplete while the user types
+        search_query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms), search_type="raw", config=SEARCH_CONFIG
+        )
+        # SearchRank takes the weights of the D, C, B and A labels
+        weights = [0.0, SEARCH_WEIGHTS["type"], SEARCH_WEIGHTS["company"], SEARCH_WEIGHTS["title"]]
+
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query, weights=weights)
+        ).order_by('-search_rank', '-created')
+
+
+class SQLiteSearchBackend:
+    """
+        Ranks jobs with bm25 against an FTS5 table holding the title, company name and job type name of every job.
+        Meant for development and tests.
+    """
+
+    def index_jobs(self, queryset: QuerySet) -> None:
+        job_ids, job_ids_params = queryset.order_by().values('id').query.sql_with_params()
+        rows, rows_params = queryset.order_by().values_list(
+            'id', 'title', 'recruiter__company_profile__name', 'type__name'
+        ).query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE job_id IN ({job_ids})", job_ids_params)
+            cursor.execute(f"INSERT INTO {FTS_TABLE} (job_id, title, company, type) {rows}", rows_params)
+
+    def remove_job(self, job_id) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE job_id = %s",
+                           [Job._meta.pk.get_db_prep_value(job_id, connection)])
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        terms = search_terms(query)
+        if not terms:
+            return SimpleSearchBackend().search(queryset, query)
+
+        # Every word has to match, the last one may be incomplete while the user types
+        match = " ".join(f'"{term}"*' for term in terms)
+        # bm25 is lower for better matches, the job id column carries no weight
+        weights = ", ".join(str(SEARCH_WEIGHTS[column]) for column in ("title", "company", "type"))
+
+        matches = f"SELECT job_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        rank = (f"SELECT -bm25({FTS_TABLE}, 0, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.job_id = {Job._meta.db_table}.id")
+
+        return queryset.filter(id__in=RawSQL(matches, [match])).annotate(
+            search_rank=RawSQL(rank, [match], output_field=FloatField())
+        ).order_by('-search_rank', '-created')
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """
+        Search backend named by the JOB_SEARCH_BACKEND setting, or the one for the database engine in use.
+    """
+    backend_path = getattr(settings, "JOB_SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)()
+    return SEARCH_BACKENDS.get(connection.vendor, SimpleSearchBackend)()
@@ -1,27 +1,43 @@
 from typing import List
 
+from django.db import IntegrityError, transaction
 from django.db.models import Q, QuerySet
 from django.http import HttpRequest
+from django.utils import timezone
 from rest_framework import status
 
+from apps.common.choices import COUNTRY_NAMES
 from apps.common.errors import ErrorCode
 from apps.common.exceptions import RequestError
+from apps.common.locations import resolve_location
+from apps.common.paginator import CustomPagination, CursorPagination
 from apps.jobs.choices import *
 from apps.jobs.models import *
-from apps.misc.models import Tip
+from apps.jobs.search import get_search_backend
+from apps.common.reference_data import TipEntry, JobTypeEntry
 from apps.notification.choices import *
 from apps.notification.models import Notification
+from utilities.caching import get_or_build_cached_data, make_cache_key, user_cache_family, get_or_none_cached
 
 User = get_user_model()
 
 
-def get_searched_jobs(query: str, user: User) -> List[dict]:
-    jobs = Job.objects.filter(
-        Q(title__icontains=query) |
-        Q(location__icontains=query) | Q(type__name__icontains=query) |
-        Q(recruiter__company_profile__name__icontains=query), active=True).order_by('-created')
+def search_jobs(queryset: QuerySet, query: str) -> QuerySet:
+    """
+        Jobs in the country the query names, newest first, or else the full-text matches ranked by relevance.
+    """
+    locations = resolve_location(query, prefix=False, codes=False)
 
-    data = [
+    if locations:
+        return queryset.filter(location__in=locations).order_by('-created')
+    return get_search_backend().search(queryset, query)
+
+
+def get_searched_jobs(request: HttpRequest, query: str, user: User) -> dict:
+    jobs = search_jobs(Job.objects.with_saved_state(user).filter(active=True), query)
+    page = CustomPagination().paginate_queryset(jobs, request)
+
+    page["items"] = [
         {
             "id": single_job.id,
             "title": single_job.title,
@@ -30,20 +46,42 @@ def get_searched_jobs(query: str, user: User) -> List[dict]:
                 "name": single_job.recruiter.company_profile.name,
             },
             "job_image": single_job.image_url,
-            "location": pycountry.countries.get(alpha_2=single_job.location).name,
+            "location": COUNTRY_NAMES.get(single_job.location),
             "type": single_job.type.name,
             "salary": single_job.salary,
-            "is_saved": single_job.is_saved_by_user(user),
+            "applications_count": single_job.applications_count,
+            "is_saved": single_job.is_saved,
         }
-        for single_job in jobs
+        for single_job in page["items"]
     ]
 
-    return data
+    return page
+
+
+def get_saved_job_ids(user: User) -> set:
+    """
+        Ids of the jobs saved by the user, cached in the user's saved jobs family.
+    """
+    cache_key = make_cache_key(f"saved_job_ids_{user.id}",
+                               families=[user_cache_family(user.id, "retrieve_saved_jobs")])
+
+    saved_job_ids = get_or_build_cached_data(
+        cache_key=cache_key, timeout=60 * 60 * 24,
+        build=lambda: list(SavedJob.objects.filter(user=user).values_list('job_id', flat=True))
+    )
+    return set(saved_job_ids)
+
+
+def mark_saved_jobs(jobs: List[dict], user: User) -> List[dict]:
+    """
+        Copy the shared job payloads with the user's saved state merged in.
+    """
+    saved_job_ids = get_saved_job_ids(user=user)
+    return [{**job, "is_saved": job["id"] in saved_job_ids} for job in jobs]
 
 
-def job_home_data(queryset: List[Job], profile_name: str, tip: Tip, job_types: List[JobType], user: User) -> dict:
+def job_home_data(queryset: List[Job], tip: TipEntry, job_types: List[JobTypeEntry]) -> dict:
     data = {
-        "profile_name": profile_name,
         "tip": {
             "id": tip.id,
             "title": tip.title,
@@ -67,10 +105,10 @@ def job_home_data(queryset: List[Job], profile_name: str, tip: Tip, job_types: L
                     "name": job.recruiter.company_profile.name,
                 },
                 "job_image": job.image_url,
-                "location": pycountry.countries.get(alpha_2=job.location).name,
+                "location": COUNTRY_NAMES.get(job.location),
                 "type": job.type.name,
                 "salary": job.salary,
-                "is_saved": job.is_saved_by_user(user)
+                "applications_count": job.applications_count,
             }
             for job in queryset
         ]
@@ -79,8 +117,16 @@ def job_home_data(queryset: List[Job], profile_name: str, tip: Tip, job_types: L
     return data
 
 
+def personalise_home_data(request: HttpRequest, data: dict) -> dict:
+    return {
+        "profile_name": request.user.employee_profile.full_name,
+        **data,
+        "jobs": mark_saved_jobs(jobs=data["jobs"], user=request.user),
+    }
+
+
 def get_job_by_id(job_id: str) -> Job:
-    job = Job.objects.get_or_none(id=job_id)
+    job = get_or_none_cached(Job, id=job_id)
 
     if job is None:
         raise RequestError(err_code=ErrorCode.NON_EXISTENT, err_msg="Job with this id does not exist",
@@ -88,7 +134,7 @@ def get_job_by_id(job_id: str) -> Job:
     return job
 
 
-def job_details_data(job: Job, user: User, request: HttpRequest) -> dict:
+def job_details_data(job: Job, request: HttpRequest) -> dict:
     return {
         "id": job.id,
         "title": job.title,
@@ -97,10 +143,10 @@ def job_details_data(job: Job, user: User, request: HttpRequest) -> dict:
             "name": job.recruiter.company_profile.name,
         },
         "job_image": job.image_url,
-        "location": pycountry.countries.get(alpha_2=job.location).name,
+        "location": COUNTRY_NAMES.get(job.location),
         "type": job.type.name,
         "salary": job.salary,
-        "is_saved": job.is_saved_by_user(user),
+        "applications_count": job.applications_count,
         "requirements": [
             {
                 "id": requirement.id,
@@ -112,53 +158,63 @@ def job_details_data(job: Job, user: User, request: HttpRequest) -> dict:
     }
 
 
-def apply_to_job(job: Job, user: User, data: dict) -> None:
-    # Check if the user has already applied to the job and their application is still pending
-    existing_pending_application = AppliedJob.objects.filter(job=job, user=user,
-                                                             status=STATUS_PENDING).exists()
-    if existing_pending_application:
-        raise RequestError(err_code=ErrorCode.ALREADY_EXISTS,
-                           err_msg="You have already applied to this job and your application is still pending.",
-                           status_code=status.HTTP_409_CONFLICT)
+def personalise_job_details_data(request: HttpRequest, data: dict) -> dict:
+    return mark_saved_jobs(jobs=[data], user=request.user)[0]
 
-    # Check if the user has already applied to the job and their application has been accepted
-    existing_accepted_application = AppliedJob.objects.filter(job=job, user=user,
-                                                              status=STATUS_ACCEPTED).exists()
-    if existing_accepted_application:
-        raise RequestError(err_code=ErrorCode.ALREADY_EXISTS,
-                           err_msg="You have already applied to this job and your application has been accepted.",
-                           status_code=status.HTTP_409_CONFLICT)
 
-    # Check if the user has already applied for the job is scheduled for an interview
-    existing_scheduled_interview = AppliedJob.objects.filter(job=job, user=user,
-                                                             status=STATUS_SCHEDULED_FOR_INTERVIEW).exists()
-    if existing_scheduled_interview:
-        raise RequestError(err_code=ErrorCode.ALREADY_EXISTS,
-                           err_msg="You have already applied to this job and your application has been scheduled for an interview.",
-                           status_code=status.HTTP_409_CONFLICT)
+# Why a user cannot apply again, by the status of their current application to the job
+APPLICATION_CONFLICTS = {
+    STATUS_PENDING: "You have already applied to this job and your application is still pending.",
+    STATUS_ACCEPTED: "You have already applied to this job and your application has been accepted.",
+    STATUS_SCHEDULED_FOR_INTERVIEW: "You have already applied to this job and your application has been scheduled "
+                                    "for an interview.",
+}
 
-    # Check if the user has already applied to the job and their application was rejected
-    existing_rejected_application = AppliedJob.objects.filter(job=job, user=user, status=STATUS_REJECTED)
 
-    if existing_rejected_application.exists():
-        existing_rejected_application.update(status=STATUS_PENDING, cv=data.get("cv"))
-    else:
-        # Create the applied job
-        AppliedJob.objects.create(job=job, cv=data.get("cv"), user=user)
+def _application_conflict(application_status: str) -> RequestError:
+    return RequestError(err_code=ErrorCode.ALREADY_EXISTS, err_msg=APPLICATION_CONFLICTS[application_status],
+                        status_code=status.HTTP_409_CONFLICT)
+
+
+def apply_to_job(job: Job, user: User, data: dict) -> None:
+    # The user's current application to the job, if any
+    application_id, current_status = AppliedJob.objects.filter(job=job, user=user).order_by(
+        '-created').values_list('id', 'status').first() or (None, None)
+
+    if current_status in APPLICATION_CONFLICTS:
+        raise _application_conflict(current_status)
+
+    try:
+        with transaction.atomic():
+            if current_status == STATUS_REJECTED:
+                # Only the latest rejected application is reopened, older ones may remain from before the
+                # constraint. Only one of concurrent requests finds it still rejected.
+                applied = AppliedJob.objects.filter(pk=application_id, status=STATUS_REJECTED).update(
+                    status=STATUS_PENDING, cv=data.get("cv"))
+            else:
+                AppliedJob.objects.create(job=job, cv=data.get("cv"), user=user)
+                applied = True
+    except IntegrityError:
+        # A concurrent request opened an application first
+        applied = False
+
+    if not applied:
+        raise _application_conflict(STATUS_PENDING)
 
     # Create notification
     Notification.objects.create(user=user, notification_type=NOTIFICATION_JOB_APPLIED,
                                 message="You have applied for a job")
 
 
-def get_applied_jobs(search: str) -> List[dict]:
-    applied_jobs = AppliedJob.objects.filter(
+def get_applied_jobs(request: HttpRequest, search: str) -> dict:
+    applied_jobs = AppliedJob.objects.for_listing().filter(
         Q(job__title__icontains=search) |
-        Q(job__location__icontains=search) | Q(job__type__name__icontains=search) |
+        Q(job__location__in=resolve_location(search)) | Q(job__type__name__icontains=search) |
         Q(job__recruiter__company_profile__name__icontains=search) |
-        Q(status__icontains=search)).order_by('-created')
+        Q(status__icontains=search))
+    page = CursorPagination().paginate_queryset(applied_jobs, request)
 
-    data = [
+    page["items"] = [
         {
             "id": single_job.id,
             "title": single_job.job.title,
@@ -169,14 +225,14 @@ def get_applied_jobs(search: str) -> List[dict]:
             "job_image": single_job.job.image_url,
             "status": single_job.status,
         }
-        for single_job in applied_jobs
+        for single_job in page["items"]
     ]
 
-    return data
+    return page
 
 
 def applied_job_details_data(job_id: str, current_user: User) -> dict:
-    applied_job = AppliedJob.objects.get_or_none(id=job_id, user=current_user)
+    applied_job = get_or_none_cached(AppliedJob, id=job_id, user_id=current_user.id)
 
     if applied_job is None:
         raise RequestError(err_code=ErrorCode.NON_EXISTENT, err_msg="Applied job with this id does not exist",
@@ -190,7 +246,7 @@ def applied_job_details_data(job_id: str, current_user: User) -> dict:
             "name": applied_job.job.recruiter.company_profile.name,
         },
         "job_image": applied_job.job.image_url,
-        "location": pycountry.countries.get(alpha_2=applied_job.job.location).name,
+        "location": COUNTRY_NAMES.get(applied_job.job.location),
         "type": applied_job.job.type.name,
         "salary": applied_job.job.salary,
         "status": applied_job.status,
@@ -213,7 +269,7 @@ def filter_applied_jobs_data(queryset: QuerySet) -> List[dict]:
             "job_image": application.job.image_url,
             "status": application.status,
             "salary": application.job.salary,
-            "location": pycountry.countries.get(alpha_2=application.job.location).name,
+            "location": COUNTRY_NAMES.get(application.job.location),
             "type": application.job.type.name,
             "review": application.review or "",
             "interview_date": application.interview_date or "",
@@ -239,10 +295,10 @@ def create_saved_jobs(job: Job, current_user: User) -> dict:
             "name": saved_job.job.recruiter.company_profile.name,
         },
         "job_image": saved_job.job.image_url,
-        "location": pycountry.countries.get(alpha_2=saved_job.job.location).name,
+        "location": COUNTRY_NAMES.get(saved_job.job.location),
         "type": saved_job.job.type.name,
         "salary": saved_job.job.salary,
-        "is_saved": saved_job.job.is_saved_by_user(current_user)
+        "is_saved": True
     }
 
     return data
@@ -258,7 +314,7 @@ def delete_saved_jobs(job_id: str, current_user: User):
     saved_job.delete()
 
 
-def get_saved_jobs_data(saved_jobs: QuerySet, current_user: User) -> dict:
+def get_saved_jobs_data(saved_jobs: QuerySet) -> dict:
     data = {
         "saved_jobs": [
             {
@@ -270,10 +326,10 @@ def get_saved_jobs_data(saved_jobs: QuerySet, current_user: User) -> dict:
                     "name": saved_job.job.recruiter.company_profile.name
                 },
                 "job_image": saved_job.job.image_url,
-                "location": pycountry.countries.get(alpha_2=saved_job.job.location).name,
+                "location": COUNTRY_NAMES.get(saved_job.job.location),
                 "type": saved_job.job.type.name,
                 "salary": saved_job.job.salary,
-                "is_saved": saved_job.job.is_saved_by_user(current_user)
+                "is_saved": True
             }
             for saved_job in saved_jobs
         ]
@@ -282,13 +338,11 @@ def get_saved_jobs_data(saved_jobs: QuerySet, current_user: User) -> dict:
     return data
 
 
-def get_search_vacancies(search: str) -> List[dict]:
-    jobs = Job.objects.filter(
-        Q(title__icontains=search) |
-        Q(location__icontains=search) | Q(type__name__icontains=search) |
-        Q(recruiter__company_profile__name__icontains=search)).order_by('-created')
+def get_search_vacancies(request: HttpRequest, search: str) -> dict:
+    jobs = search_jobs(Job.objects.for_listing(), search)
+    page = CustomPagination().paginate_queryset(jobs, request)
 
-    data = [
+    page["items"] = [
         {
             "id": single_job.id,
             "title": single_job.title,
@@ -297,15 +351,17 @@ def get_search_vacancies(search: str) -> List[dict]:
                 "full_name": single_job.recruiter.company_profile.name
             },
             "job_image": single_job.image_url,
-            "location": pycountry.countries.get(alpha_2=single_job.location).name,
+            "location": COUNTRY_NAMES.get(single_job.location),
             "type": single_job.type.name,
             "salary": single_job.salary,
             "active": single_job.active,
+            "applications_count": single_job.applications_count,
+            "saves_count": single_job.saves_count,
         }
-        for single_job in jobs
+        for single_job in page["items"]
     ]
 
-    return data
+    return page
 
 
 def vacancies_home_data(queryset: QuerySet, profile_name: str, applied_jobs: QuerySet) -> dict:
@@ -317,10 +373,12 @@ def vacancies_home_data(queryset: QuerySet, profile_name: str, applied_jobs: Que
                 "title": job.title,
                 "recruiter": job.recruiter.company_profile.name,
                 "job_image": job.image_url,
-                "location": pycountry.countries.get(alpha_2=job.location).name,
+                "location": COUNTRY_NAMES.get(job.location),
                 "type": job.type.name,
                 "salary": job.salary,
-                "active": job.active
+                "active": job.active,
+                "applications_count": job.applications_count,
+                "saves_count": job.saves_count,
             }
             for job in queryset
         ],
@@ -369,27 +427,40 @@ def create_vacancy_application(current_user: User, data: dict, requirements_data
 def update_vacancy_data(serialized_data: dict, requirements_data: list, job_instance: Job) -> dict:
     for key, value in serialized_data.items():
         setattr(job_instance, key, value)
-    job_instance.save()
+    # Only the submitted fields are written, the counters are kept up to date by atomic updates
+    job_instance.save(update_fields=[*serialized_data, "updated"])
 
     if requirements_data is not None:
-        for requirement in requirements_data:
+        # The submitted requirements replace the current ones, matched up by id
+        existing_requirements = {str(requirement.id): requirement for requirement in job_instance.requirements.all()}
+        changed_requirements, new_requirements = [], []
 
-            # Try to get the existing requirement
+        for requirement in requirements_data:
             requirement_id = requirement.get("id")
             requirement_text = requirement.get("requirement")
 
-            # Gets the requirement and updates it if the correct id is provided
-            if requirement_id:
-                try:
-                    existing_requirement = JobRequirement.objects.get(id=requirement_id, job=job_instance)
-                    existing_requirement.requirement = requirement_text
-                    existing_requirement.save()
-                except JobRequirement.DoesNotExist:
-                    raise RequestError(err_code=ErrorCode.NON_EXISTENT, err_msg="One of the requirements doesn't exist",
-                                       status_code=status.HTTP_404_NOT_FOUND)
-            else:
-                # Create a new requirement if id is not provided
-                JobRequirement.objects.create(job=job_instance, requirement=requirement_text)
+            # Create a new requirement if id is not provided
+            if not requirement_id:
+                new_requirements.append(JobRequirement(job=job_instance, requirement=requirement_text))
+                continue
+
+            existing_requirement = existing_requirements.pop(str(requirement_id), None)
+            if existing_requirement is None:
+                raise RequestError(err_code=ErrorCode.NON_EXISTENT, err_msg="One of the requirements doesn't exist",
+                                   status_code=status.HTTP_404_NOT_FOUND)
+
+            if existing_requirement.requirement != requirement_text:
+                existing_requirement.requirement = requirement_text
+                existing_requirement.updated = timezone.now()
+                changed_requirements.append(existing_requirement)
+
+        # Bulk writes skip the requirement signals, the job details were already invalidated by the job save above
+        JobRequirement.objects.bulk_update(changed_requirements, fields=["requirement", "updated"])
+        JobRequirement.objects.bulk_create(new_requirements)
+
+        # Requirements left out of the payload were removed
+        if existing_requirements:
+            JobRequirement.objects.filter(id__in=existing_requirements).delete()
 
     data = {
         "id": job_instance.id,
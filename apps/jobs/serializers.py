@@ -1,18 +1,40 @@
-import pycountry
+from uuid import UUID
+
 from django.core.validators import FileExtensionValidator
 from django.utils import timezone
 from rest_framework import serializers
 
+from apps.common.choices import COUNTRY_CHOICES
+from apps.common.reference_data import reference_data
 from apps.jobs.choices import STATUS_CHOICES, STATUS_SCHEDULED_FOR_INTERVIEW
 from apps.jobs.models import JobType
 
 
+class JobTypeField(serializers.PrimaryKeyRelatedField):
+    """
+        Looks job types up in the reference data, falling back to the database for types it does not know yet.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(queryset=JobType.objects.all(), **kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            job_type = reference_data.get().job_types_by_id.get(UUID(str(data)))
+        except ValueError:
+            job_type = None
+
+        if job_type is None:
+            return super().to_internal_value(data)
+        return JobType.from_db(JobType.objects.db, ['id', 'name'], [job_type.id, job_type.name])
+
+
 class CreateJobSerializer(serializers.Serializer):
     image = serializers.ImageField()
     title = serializers.CharField()
     salary = serializers.DecimalField(max_digits=10, decimal_places=2)
-    location = serializers.ChoiceField(choices=[(country.alpha_2, country.name) for country in pycountry.countries])
-    type = serializers.PrimaryKeyRelatedField(queryset=JobType.objects.all())
+    location = serializers.ChoiceField(choices=COUNTRY_CHOICES)
+    type = JobTypeField()
     requirements = serializers.ListField(child=serializers.CharField())
 
 
@@ -25,8 +47,8 @@ class UpdateVacanciesSerializer(serializers.Serializer):
     image = serializers.ImageField()
     title = serializers.CharField()
     salary = serializers.DecimalField(max_digits=10, decimal_places=2)
-    location = serializers.ChoiceField(choices=[(country.alpha_2, country.name) for country in pycountry.countries], )
-    type = serializers.PrimaryKeyRelatedField(queryset=JobType.objects.all())
+    location = serializers.ChoiceField(choices=COUNTRY_CHOICES)
+    type = JobTypeField()
     requirements = serializers.ListField(child=JobRequirementSerializer())
     active = serializers.BooleanField()
 
@@ -1,32 +1,57 @@
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_init, post_save, post_delete, pre_save
 from django.dispatch import receiver
 
-from apps.jobs.models import Job, AppliedJob, SavedJob, JobType
-from utilities.caching import clear_cache, clear_user_cache
+from apps.core.models import CompanyProfile
+from apps.jobs.autocomplete import SUGGESTION_KINDS, SUGGESTION_SOURCES, refresh_autocomplete_suggestions
+from apps.jobs.models import Job, AppliedJob, SavedJob, JobType, JobRequirement, JOB_COUNTERS
+from apps.jobs.search import get_search_backend, INDEXED_FIELDS
+from utilities.caching import clear_cache, clear_user_cache, clear_not_found
+
+
+def clear_recruiter_vacancies_cache(instance) -> None:
+    """
+        Clear the vacancies of the recruiter owning the job of an application or save
+        :param instance:
+        :return:
+    """
+    if type(instance).job.is_cached(instance):
+        recruiter_id = instance.job.recruiter_id
+    else:
+        recruiter_id = Job.objects.filter(pk=instance.job_id).values_list('recruiter_id', flat=True).first()
+
+    # Gone along with its job, whose own deletion cleared the vacancies
+    if recruiter_id is not None:
+        clear_user_cache(user_id=recruiter_id, pattern_string="retrieve_vacancies")
 
 
 @receiver(post_save, sender=Job)
 @receiver(post_delete, sender=Job)
-def clear_jobs_cache(sender, **kwargs):
+def clear_jobs_cache(sender, instance, **kwargs):
     """
         Clear cache when a job is created, deleted or updated
         :param sender:
+        :param instance:
         :param kwargs:
         :return:
     """
-    clear_cache(cache_key_prefixes=["retrieve_jobs", "retrieve_job", "retrieve_vacancies"])
+    clear_cache(cache_key_prefixes=["retrieve_jobs", "retrieve_job"])
+    clear_user_cache(user_id=instance.recruiter_id, pattern_string="retrieve_vacancies")
 
 
 @receiver(post_save, sender=AppliedJob)
 @receiver(post_delete, sender=AppliedJob)
-def clear_vacancies_cache(sender, **kwargs):
+def clear_vacancies_cache(sender, instance, **kwargs):
     """
         Clear cache when a appliedjob is created, updated or deleted
         :param sender:
+        :param instance:
         :param kwargs:
         :return:
     """
-    clear_cache(cache_key_prefixes=["retrieve_vacancies", "retrieve_applied_job"])
+    clear_cache(cache_key_prefixes=["retrieve_applied_job"])
+    clear_recruiter_vacancies_cache(instance)
 
 
 @receiver(post_save, sender=AppliedJob)
@@ -63,6 +88,49 @@ def clear_saved_job_cache(sender, instance, **kwargs):
     clear_user_cache(user_id=user_id, pattern_string="retrieve_saved_jobs")
 
 
+@receiver(post_save, sender=AppliedJob)
+@receiver(post_save, sender=SavedJob)
+def count_job_activity(sender, instance, created, **kwargs):
+    """
+        Count a new application or save in its job, atomically so concurrent ones are not lost
+        :param sender:
+        :param instance:
+        :param created:
+        :param kwargs:
+        :return:
+    """
+    if created:
+        counter = JOB_COUNTERS[sender]
+        Job.objects.filter(pk=instance.job_id).update(**{counter: F(counter) + 1})
+
+
+@receiver(post_delete, sender=AppliedJob)
+@receiver(post_delete, sender=SavedJob)
+def uncount_job_activity(sender, instance, **kwargs):
+    """
+        Take a deleted application or save off the count of its job
+        :param sender:
+        :param instance:
+        :param kwargs:
+        :return:
+    """
+    counter = JOB_COUNTERS[sender]
+    Job.objects.filter(pk=instance.job_id, **{f"{counter}__gt": 0}).update(**{counter: F(counter) - 1})
+
+
+@receiver(post_save, sender=SavedJob)
+@receiver(post_delete, sender=SavedJob)
+def clear_saved_job_vacancies_cache(sender, instance, **kwargs):
+    """
+        Clear the vacancies of the job's recruiter, which show the saves count, when a job is saved or unsaved
+        :param sender:
+        :param instance:
+        :param kwargs:
+        :return:
+    """
+    clear_recruiter_vacancies_cache(instance)
+
+
 @receiver(post_save, sender=JobType)
 @receiver(post_delete, sender=JobType)
 def clear_job_type_cache(sender, **kwargs):
@@ -73,3 +141,162 @@ def clear_job_type_cache(sender, **kwargs):
         :return:
     """
     clear_cache(cache_key_prefixes=["retrieve_job_types"])
+
+
+@receiver(post_save, sender=JobRequirement)
+@receiver(post_delete, sender=JobRequirement)
+def clear_job_requirements_cache(sender, **kwargs):
+    """
+        Clear cache when a job requirement is created, updated or deleted
+        :param sender:
+        :param kwargs:
+        :return:
+    """
+    clear_cache(cache_key_prefixes=["retrieve_job"])
+
+
+@receiver(post_save, sender=Job)
+def clear_job_not_found_cache(sender, instance, created, **kwargs):
+    """
+        Forget cached misses for a job once it is created
+        :param sender:
+        :param instance:
+        :param created:
+        :param kwargs:
+        :return:
+    """
+    if created:
+        clear_not_found(Job, id=instance.id)
+
+
+@receiver(post_save, sender=AppliedJob)
+def clear_applied_job_not_found_cache(sender, instance, created, **kwargs):
+    """
+        Forget cached misses for an applied job once it is created
+        :param sender:
+        :param instance:
+        :param created:
+        :param kwargs:
+        :return:
+    """
+    if created:
+        clear_not_found(AppliedJob, id=instance.id, user_id=instance.user_id)
+
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, update_fields, **kwargs):
+    """
+        Keep the search index of a job current when its title, recruiter or type is saved
+        :param sender:
+        :param instance:
+        :param update_fields:
+        :param kwargs:
+        :return:
+    """
+    if update_fields is None or INDEXED_FIELDS.intersection(update_fields):
+        get_search_backend().index_jobs(Job.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_index(sender, instance, **kwargs):
+    """
+        Drop a deleted job from the search index
+        :param sender:
+        :param instance:
+        :param kwargs:
+        :return:
+    """
+    get_search_backend().remove_job(instance.pk)
+
+
+@receiver(post_save, sender=JobType)
+def reindex_job_type_jobs(sender, instance, created, **kwargs):
+    """
+        Reindex the jobs of a job type when it is renamed
+        :param sender:
+        :param instance:
+        :param created:
+        :param kwargs:
+        :return:
+    """
+    if not created:
+        get_search_backend().index_jobs(Job.objects.filter(type=instance))
+
+
+@receiver(post_save, sender=CompanyProfile)
+def reindex_company_jobs(sender, instance, **kwargs):
+    """
+        Reindex the jobs of a company when its profile is saved
+        :param sender:
+        :param instance:
+        :param kwargs:
+        :return:
+    """
+    get_search_backend().index_jobs(Job.objects.filter(recruiter_id=instance.user_id))
+
+
+@receiver(post_init, sender=Job)
+@receiver(post_init, sender=JobType)
+@receiver(post_init, sender=CompanyProfile)
+def remember_loaded_suggestion(sender, instance, **kwargs):
+    """
+        Keep the autocomplete text a row was loaded with, so saving it can tell whether the text changed
+        :param sender:
+        :param instance:
+        :param kwargs:
+        :return:
+    """
+    _, _, field = SUGGESTION_SOURCES[SUGGESTION_KINDS[sender]]
+
+    # Deferred fields are missing from the instance dict. New rows are told apart in pre_save, post_init runs
+    # before from_db marks a loaded row as no longer being added.
+    if field in instance.__dict__:
+        instance._loaded_suggestion = instance.__dict__[field]
+
+
+@receiver(pre_save, sender=Job)
+@receiver(pre_save, sender=JobType)
+@receiver(pre_save, sender=CompanyProfile)
+def remember_suggestion(sender, instance, update_fields, **kwargs):
+    """
+        Remember the autocomplete text of a row before it is saved, so a renamed row stops suggesting its old one
+        :param sender:
+        :param instance:
+        :param update_fields:
+        :param kwargs:
+        :return:
+    """
+    _, _, field = SUGGESTION_SOURCES[SUGGESTION_KINDS[sender]]
+
+    if instance._state.adding or (update_fields is not None and field not in update_fields):
+        instance._previous_suggestion = None
+    elif hasattr(instance, "_loaded_suggestion"):
+        # An unchanged text leaves nothing to forget
+        loaded = instance._loaded_suggestion
+        instance._previous_suggestion = None if loaded == getattr(instance, field) else loaded
+    else:
+        # The text was deferred when the row was loaded
+        instance._previous_suggestion = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=JobType)
+@receiver(post_delete, sender=JobType)
+@receiver(post_save, sender=CompanyProfile)
+@receiver(post_delete, sender=CompanyProfile)
+def refresh_suggestions(sender, instance, **kwargs):
+    """
+        Update the autocomplete suggestions of a row once the transaction saving or deleting it commits
+        :param sender:
+        :param instance:
+        :param kwargs:
+        :return:
+    """
+    kind = SUGGESTION_KINDS[sender]
+    _, _, field = SUGGESTION_SOURCES[kind]
+    texts = {getattr(instance, field), getattr(instance, "_previous_suggestion", None)}
+    # The saved text is what a later save of the same instance compares against
+    instance._loaded_suggestion = getattr(instance, field)
+
+    transaction.on_commit(lambda: refresh_autocomplete_suggestions(kind, texts))
@@ -1,16 +1,28 @@
 import json
 import random
 import uuid
-from io import BytesIO
+from io import BytesIO, StringIO
 
 from PIL import Image
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy, reverse
 
+from apps.chat.models import Message
 from apps.common.tests.tests import AuthTestCase
 from apps.core.models import CompanyProfile, EmployeeProfile
+from apps.jobs.choices import STATUS_PENDING, STATUS_REJECTED
+from apps.jobs.autocomplete import AUTOCOMPLETE_KEY
 from apps.jobs.models import Job, JobType, AppliedJob, SavedJob
+from apps.jobs.selectors import update_vacancy_data
+from apps.notification.models import Notification
+from utilities.caching import get_cache_versions, user_cache_family
+from utilities.local_cache import get_redis_client, local_cache
 
 User = get_user_model()
 
@@ -72,6 +84,72 @@ class JobsTestCase(AuthTestCase):
         response = self.client.get(self.home_url, data=query_params)
         self.assertEqual(response.status_code, 200)
 
+    def test_type_filter_matches_every_type_with_the_name(self):
+        self._authenticate_with_tokens()
+        Job.objects.update(active=False)
+        twin_types = JobType.objects.bulk_create([JobType(name='Twin'), JobType(name='Twin')])
+        twin_job_ids = {
+            str(Job.objects.create(recruiter=self.new_recruiter, type=job_type, title='Twin Job', salary=10).id)
+            for job_type in twin_types
+        }
+
+        response = self.client.get(self.home_url, data={'type': 'Twin'})
+        self.assertEqual({job['id'] for job in response.json()['data']['jobs']}, twin_job_ids)
+
+    def test_location_accepts_country_names(self):
+        self._authenticate_with_tokens()
+        portugal_job_ids = [str(job_id) for job_id in Job.objects.filter(location='PT').values_list('id', flat=True)]
+
+        for location in ['PT', 'portugal', 'Portuguese Republic', 'portu']:
+            response = self.client.get(self.home_url, data={'location': location})
+            self.assertEqual([job['id'] for job in response.json()['data']['jobs']], portugal_job_ids)
+
+        response = self.client.get(reverse('search-jobs'), data={'search': 'Portugal'})
+        self.assertEqual([job['id'] for job in response.json()['data']['items']], portugal_job_ids)
+
+    def test_home_view_cursor_pagination(self):
+        self._authenticate_with_tokens()
+
+        job_ids, cursor = [], None
+        while True:
+            params = {'page_size': 3, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(self.home_url, data=params).json()['data']
+            self.assertLessEqual(len(data['jobs']), 3)
+
+            job_ids += [job['id'] for job in data['jobs']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+
+        expected = Job.objects.filter(active=True).order_by('-created', '-id').values_list('id', flat=True)
+        self.assertEqual(job_ids, [str(job_id) for job_id in expected])
+
+        response = self.client.get(self.home_url, data={'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_saved_state_is_merged_into_shared_payloads(self):
+        self._authenticate_with_tokens()
+
+        single_job = self.jobs.first()
+        retrieve_single_job_url = reverse('job-details', kwargs={'id': single_job.id})
+
+        # Warm the shared caches before saving the job
+        self.client.get(self.home_url)
+        self.client.get(retrieve_single_job_url)
+
+        # Cache invalidations are sent once the transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('create-delete-saved-job', kwargs={'id': single_job.id}))
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.home_url)
+        saved_states = {job['id']: job['is_saved'] for job in response.data.get('data').get('jobs')}
+        self.assertTrue(saved_states.pop(single_job.id))
+        self.assertFalse(any(saved_states.values()))
+
+        response = self.client.get(retrieve_single_job_url)
+        self.assertTrue(response.data.get('data').get('is_saved'))
+
     def test_get_specific_details_with_employee_login(self):
         self._authenticate_with_tokens()
 
@@ -109,6 +187,31 @@ class JobsTestCase(AuthTestCase):
         response = self.client.post(apply_job_url, data=new_data)
         self.assertEqual(response.status_code, 409)
 
+    def test_apply_job_again_after_rejection(self):
+        self.test_apply_job()
+        employee = User.objects.get(email=self.employee_data.get('email'))
+        single_job = self.jobs.first()
+        apply_job_url = reverse('job-apply', kwargs={'id': single_job.id})
+
+        # The database refuses a second active application, whoever sends it
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AppliedJob.objects.create(job=single_job, user=employee, cv=SimpleUploadedFile("cv.pdf", b"cv"))
+
+        AppliedJob.objects.filter(job=single_job, user=employee).update(status=STATUS_REJECTED)
+        response = self.client.post(apply_job_url, data={'cv': SimpleUploadedFile("cv.pdf", b"cv")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(AppliedJob.objects.filter(job=single_job, user=employee).values_list('status', flat=True)),
+                         [STATUS_PENDING])
+
+        # Rejected applications sent before the constraint existed are not all reopened
+        AppliedJob.objects.filter(job=single_job, user=employee).update(status=STATUS_REJECTED)
+        AppliedJob.objects.create(job=single_job, user=employee, status=STATUS_REJECTED,
+                                  cv=SimpleUploadedFile("cv.pdf", b"cv"))
+        response = self.client.post(apply_job_url, data={'cv': SimpleUploadedFile("cv.pdf", b"cv")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(AppliedJob.objects.filter(job=single_job, user=employee).order_by(
+            'created').values_list('status', flat=True)), [STATUS_REJECTED, STATUS_PENDING])
+
     def test_search_applied_jobs(self):
         self.test_apply_job()  # Get the applied job
 
@@ -163,12 +266,193 @@ class JobsTestCase(AuthTestCase):
         response = self.client.delete(delete_saved_job_url)
         self.assertEqual(response.status_code, 404)
 
+    def test_job_counters_follow_applications_and_saves(self):
+        self.test_apply_job()
+        single_job = self.jobs.first()
+        stale_job = Job.objects.get(id=single_job.id)
+
+        save_job_url = reverse('create-delete-saved-job', kwargs={'id': single_job.id})
+        self.assertEqual(self.client.post(save_job_url).status_code, 200)
+        single_job.refresh_from_db()
+        self.assertEqual((single_job.applications_count, single_job.saves_count), (1, 1))
+
+        # Updating a job loaded earlier keeps the counts moved on since
+        update_vacancy_data(serialized_data={'title': 'Renamed'}, requirements_data=None, job_instance=stale_job)
+        single_job.refresh_from_db()
+        self.assertEqual((single_job.applications_count, single_job.saves_count), (1, 1))
+
+        SavedJob.objects.filter(job=single_job).delete()
+        Job.objects.update(applications_count=5)
+        out = StringIO()
+        call_command('reconcile_job_counters', batch_size=2, stdout=out)
+        self.assertIn(f"Checked {self.jobs.count()} jobs, repaired {self.jobs.count()}.", out.getvalue())
+
+        single_job.refresh_from_db()
+        self.assertEqual((single_job.applications_count, single_job.saves_count), (1, 0))
+
+    def test_saving_a_job_only_clears_its_recruiter_vacancies(self):
+        self._authenticate_with_tokens()
+        single_job = self.jobs.first()
+        families = [user_cache_family(self.new_recruiter.id, "retrieve_vacancies"),
+                    user_cache_family(uuid.uuid4(), "retrieve_vacancies")]
+        versions = get_cache_versions(families)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('create-delete-saved-job', kwargs={'id': single_job.id}))
+        self.assertEqual(response.status_code, 200)
+
+        new_versions = get_cache_versions(families)
+        self.assertNotEqual(new_versions[families[0]], versions[families[0]])
+        self.assertEqual(new_versions[families[1]], versions[families[1]])
+
     def test_retrieve_all_saved_jobs(self):
         self._authenticate_with_tokens()
 
         response = self.client.get(self.saved_jobs_url)
         self.assertEqual(response.status_code, 200)
 
+    def test_search_jobs_is_ranked_and_paginated(self):
+        self._authenticate_with_tokens()
+        search_jobs_url = reverse('search-jobs')
+
+        zebra_type = JobType.objects.create(name='Zebra Care')
+        type_match = Job.objects.create(recruiter=self.new_recruiter, type=zebra_type, title='Keeper', salary=10,
+                                        location='US')
+        title_match = Job.objects.create(recruiter=self.new_recruiter, type=self.job_types[0], title='Zebra Trainer',
+                                         salary=10, location='US')
+
+        response = self.client.get(search_jobs_url, data={'search': 'zebr'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job['id'] for job in response.json()['data']['items']],
+                         [str(title_match.id), str(type_match.id)])
+
+        response = self.client.get(search_jobs_url, data={'search': 'zebra', 'page_size': 1, 'page': 2})
+        data = response.json()['data']
+        self.assertEqual(data['last_page'], 2)
+        self.assertEqual([job['id'] for job in data['items']], [str(type_match.id)])
+
+        # Renaming the company reindexes its jobs
+        company_profile = CompanyProfile.objects.get(user=self.new_recruiter)
+        company_profile.name = 'Quokka Labs'
+        company_profile.save()
+
+        response = self.client.get(search_jobs_url, data={'search': 'quokka zebra'})
+        self.assertEqual(len(response.json()['data']['items']), 2)
+
+    def test_autocomplete_follows_job_changes(self):
+        self._authenticate_with_tokens()
+        autocomplete_url = reverse('jobs-autocomplete')
+
+        def suggestions(prefix):
+            response = self.client.get(autocomplete_url, data={'q': prefix})
+            self.assertEqual(response.status_code, 200)
+            return [(suggestion['text'], suggestion['kind']) for suggestion in response.json()['data']]
+
+        # The index is built from the database on first use, later changes are applied as they commit
+        self.assertIn(('Test Company', 'company'), suggestions('test c'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(recruiter=self.new_recruiter, type=self.job_types[0], title='Walrus Keeper',
+                                     salary=10, location='US')
+        self.assertEqual(suggestions('walrus'), [('Walrus Keeper', 'title')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.title = 'Walrus Trainer'
+            job.save()
+        self.assertEqual(suggestions('WALRUS'), [('Walrus Trainer', 'title')])
+
+        # A loaded job knows its title, saving it without a rename does not read the title back
+        job = Job.objects.get(id=job.id)
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            job.active = False
+            job.save()
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT "jobs_job"."title"')])
+        self.assertEqual(suggestions('walrus'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.active = True
+            job.title = 'Walrus Feeder'
+            job.save()
+        self.assertEqual(suggestions('walrus'), [('Walrus Feeder', 'title')])
+
+    def test_autocomplete_answers_from_the_database_while_the_index_builds(self):
+        self._authenticate_with_tokens()
+        client = get_redis_client()
+        client.delete(cache.make_and_validate_key(AUTOCOMPLETE_KEY))
+
+        # Another worker holds the build lock
+        cache.add(f"rebuild_lock:{AUTOCOMPLETE_KEY}", "other-worker", timeout=60)
+        response = self.client.get(reverse('jobs-autocomplete'), data={'q': 'test c'})
+        self.assertIn({'text': 'Test Company', 'kind': 'company'}, response.json()['data'])
+        self.assertFalse(client.exists(cache.make_and_validate_key(AUTOCOMPLETE_KEY)))
+
+        cache.delete(f"rebuild_lock:{AUTOCOMPLETE_KEY}")
+        self.client.get(reverse('jobs-autocomplete'), data={'q': 'test c'})
+        self.assertTrue(client.exists(cache.make_and_validate_key(AUTOCOMPLETE_KEY)))
+
+    def test_listing_queries_do_not_grow_with_rows(self):
+        self._authenticate_with_tokens()
+        employee = User.objects.get(email=self.employee_data.get('email'))
+        search_jobs_url = reverse('search-jobs')
+
+        def count_queries(url):
+            cache.clear()
+            local_cache.clear()
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        def add_rows(jobs):
+            for job in jobs:
+                SavedJob.objects.create(job=job, user=employee)
+                AppliedJob.objects.create(job=job, user=employee,
+                                          cv=SimpleUploadedFile("cv.pdf", b"cv", content_type="application/pdf"))
+
+        add_rows(self.jobs[:1])
+
+        # The first request also loads the user's profile, which is then kept on the authenticated user
+        count_queries(search_jobs_url)
+        listing_urls = [search_jobs_url, self.saved_jobs_url, self.filter_applied_jobs_url,
+                        self.search_applied_jobs_url]
+        queries = [count_queries(url) for url in listing_urls]
+
+        add_rows(self.jobs[1:])
+
+        self.assertEqual([count_queries(url) for url in listing_urls], queries)
+
+    def _query_plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # The test tables are too small for the planner to prefer an index over a sequential scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_hot_queries_use_indexes(self):
+        self._authenticate_with_tokens()
+        employee = User.objects.get(email=self.employee_data.get('email'))
+        for job in self.jobs:
+            AppliedJob.objects.create(job=job, user=employee,
+                                      cv=SimpleUploadedFile("cv.pdf", b"cv", content_type="application/pdf"))
+
+        active_jobs = Job.objects.filter(active=True).order_by('-created', '-id')
+        plans = {
+            'job_active_feed_idx': active_jobs,
+            'job_type_feed_idx': active_jobs.filter(type=self.job_types[0]),
+            'job_location_feed_idx': active_jobs.filter(location__in=['US', 'GB']),
+            'appliedjob_user_status_idx': AppliedJob.objects.filter(user=employee, status=STATUS_PENDING),
+            'message_conversation_idx': Message.objects.filter(
+                Q(sender=employee, receiver=self.new_recruiter) | Q(sender=self.new_recruiter, receiver=employee)
+            ).order_by('created', 'id'),
+            'message_unread_idx': Message.objects.filter(receiver=employee, is_read=False),
+            'notification_user_created_idx': Notification.objects.filter(user=employee).order_by('-created', '-id'),
+        }
+
+        for index_name, queryset in plans.items():
+            with self.subTest(index_name):
+                self.assertIn(index_name, self._query_plan(queryset))
+
     """
     COMPANY SECTION
     """
@@ -238,6 +522,20 @@ class JobsTestCase(AuthTestCase):
         }
         updated_response = self.client.patch(update_job_vacancy_url, data=updated_data)
         self.assertEqual(updated_response.status_code, 202)
+        self.assertEqual(self.created_job.requirements.count(), 2)
+
+        # The submitted requirements replace the existing ones
+        kept, removed = self.created_job.requirements.order_by('requirement')
+        requirements_data = {'requirements': [{'id': str(kept.id), 'requirement': 'Requirement 1 updated'},
+                                              {'requirement': 'Requirement 3'}]}
+        updated_response = self.client.patch(update_job_vacancy_url, data=requirements_data, format='json')
+        self.assertEqual(updated_response.status_code, 202)
+        self.assertEqual(sorted(self.created_job.requirements.values_list('requirement', flat=True)),
+                         ['Requirement 1 updated', 'Requirement 3'])
+
+        requirements_data = {'requirements': [{'id': str(removed.id), 'requirement': 'Requirement 2'}]}
+        updated_response = self.client.patch(update_job_vacancy_url, data=requirements_data, format='json')
+        self.assertEqual(updated_response.status_code, 404)
 
         # Delete a job
         delete_job_vacancy_url = reverse('update-delete-job', kwargs={'id': self.created_job.id})
@@ -6,6 +6,7 @@ urlpatterns = [
     path('countries', ListCountriesView.as_view(), name="list-countries"),
     path('', JobsHomeView.as_view(), name="jobs-home"),
     path('search-jobs', SearchJobsView.as_view(), name="search-jobs"),
+    path('autocomplete', AutocompleteView.as_view(), name="jobs-autocomplete"),
     path('job/<str:id>', JobDetailsView.as_view(), name="job-details"),
     path('job/apply/<str:id>', JobApplyView.as_view(), name="job-apply"),
     path('applied-jobs/search', AppliedJobsSearchView.as_view(), name="applied-jobs-search"),
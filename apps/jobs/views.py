@@ -1,20 +1,20 @@
 from django.core.cache import cache
 from django.db import transaction
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
+from apps.common.paginator import CursorPagination
 from apps.common.permissions import IsAuthenticatedEmployee, IsAuthenticatedCompany
+from apps.common.reference_data import reference_data
 from apps.common.responses import CustomResponse
+from apps.jobs.autocomplete import get_autocomplete_suggestions
 from apps.jobs.docs.docs import *
 from apps.jobs.filters import JobFilter, AppliedJobFilter, VacanciesFilter
 from apps.jobs.selectors import *
 from apps.jobs.serializers import CreateJobSerializer, UpdateVacanciesSerializer, UpdateAppliedJobSerializer, \
     JobApplySerializer
-from apps.misc.models import Tip
-from utilities.caching import set_cached_data, get_cached_data
+from utilities.caching import cache_response, user_family, SCOPE_USER
 
 
 # # Create your views here.
@@ -22,14 +22,13 @@ from utilities.caching import set_cached_data, get_cached_data
 class ListCountriesView(APIView):
 
     @country_docs()
-    @method_decorator(cache_page(60 * 60 * 24 * 7, key_prefix="retrieve_countries"))
     def get(self, request):
         countries = [
             {
                 'name': country.name,
                 'alpha_2': country.alpha_2,
             }
-            for country in pycountry.countries
+            for country in reference_data.get().countries
         ]
 
         return CustomResponse.success(message="Retrieved successfully", data=countries)
@@ -43,43 +42,40 @@ class SearchJobsView(APIView):
         search = request.query_params.get('search', '')
         current_user = request.user
 
-        data = get_searched_jobs(query=search, user=current_user)
+        data = get_searched_jobs(request=request, query=search, user=current_user)
         return CustomResponse.success(message="Successfully retrieved searched jobs", data=data)
 
 
-class JobsHomeView(APIView):
+class AutocompleteView(APIView):
     permission_classes = (IsAuthenticatedEmployee,)
-    filter_backends = [DjangoFilterBackend]
-    filterset_class = JobFilter
 
-    @job_home_docs()
+    @autocomplete_docs()
     def get(self, request):
-        # Get query param
-        query_params = request.GET.urlencode()
-
-        # Set key for query_param search results
-        cache_key = f"retrieve_jobs_{query_params}"
-        cached_data = get_cached_data(cache_key=cache_key)
+        prefix = request.query_params.get('q', '')
 
-        # Return cached data if it exists
-        if cached_data:
-            return CustomResponse.success(message="Retrieved successfully", data=cached_data)
+        data = get_autocomplete_suggestions(prefix=prefix)
+        return CustomResponse.success(message="Successfully retrieved suggestions", data=data)
 
-        current_user = request.user
-        profile_name = current_user.employee_profile.full_name
 
-        tip = Tip.objects.only('title').order_by('-created').first()
+class JobsHomeView(APIView):
+    permission_classes = (IsAuthenticatedEmployee,)
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = JobFilter
 
-        job_types = JobType.objects.only('name')
+    @job_home_docs()
+    @cache_response(key_prefix="retrieve_jobs", timeout=60 * 60, stale=True, overlay=personalise_home_data,
+                    families=["retrieve_jobs", "retrieve_tips", "retrieve_job_types"],
+                    overlay_families=[user_family("retrieve_saved_jobs"), user_family("employee_profile")])
+    def get(self, request):
+        # The feed is cached once for every user, their profile name and saved jobs are merged in by the overlay
+        references = reference_data.get()
 
         queryset = Job.objects.get_active_jobs()
         queryset = self.filterset_class(data=request.GET, queryset=queryset).qs
+        page = CursorPagination().paginate_queryset(queryset, request)
 
-        data = job_home_data(queryset=queryset, profile_name=profile_name, tip=tip, job_types=job_types,
-                             user=current_user)
-
-        # Set cache data
-        set_cached_data(cache_key, data, 60 * 60)
+        data = job_home_data(queryset=page["items"], tip=references.latest_tip, job_types=references.job_types)
+        data["next_cursor"] = page["next_cursor"]
         return CustomResponse.success(message="Retrieved successfully", data=data)
 
 
@@ -87,22 +83,14 @@ class JobDetailsView(APIView):
     permission_classes = (IsAuthenticated,)
 
     @job_details_docs()
+    @cache_response(key_prefix="retrieve_job", timeout=60 * 60, local=True, overlay=personalise_job_details_data,
+                    overlay_families=[user_family("retrieve_saved_jobs")])
     def get(self, request, *args, **kwargs):
         job_id = kwargs.get('id')
 
-        # Set key for query_param search results
-        cache_key = f"retrieve_job_{job_id}"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        # Return cached data if it exists
-        if cached_data:
-            return CustomResponse.success(message="Retrieved successfully", data=cached_data)
-
         job = get_job_by_id(job_id=job_id)
 
-        data = job_details_data(job=job, user=request.user, request=request)
-
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60)
+        data = job_details_data(job=job, request=request)
         return CustomResponse.success(message="Successfully retrieved job details", data=data)
 
 
@@ -133,7 +121,7 @@ class AppliedJobsSearchView(APIView):
     def get(self, request, *args, **kwargs):
         search = request.query_params.get('search', '')
 
-        data = get_applied_jobs(search=search)
+        data = get_applied_jobs(request=request, search=search)
         return CustomResponse.success(message="Successfully retrieved searched applied jobs", data=data)
 
 
@@ -141,20 +129,11 @@ class AppliedJobDetailsView(APIView):
     permission_classes = (IsAuthenticatedEmployee,)
 
     @applied_job_details_docs()
+    @cache_response(key_prefix="retrieve_applied_job", timeout=60 * 60, scope=SCOPE_USER)
     def get(self, request, *args, **kwargs):
         applied_job_id = kwargs.get('id')
 
-        # Set key for query_param search results
-        cache_key = f"retrieve_applied_job_{applied_job_id}"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        # Return cached data if it exists
-        if cached_data:
-            return CustomResponse.success(message="Retrieved successfully", data=cached_data)
-
         data = applied_job_details_data(job_id=applied_job_id, current_user=request.user)
-
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60)
         return CustomResponse.success(message="Successfully retrieved applied job details", data=data)
 
 
@@ -164,27 +143,17 @@ class FilterAppliedJobsView(APIView):
     filterset_class = AppliedJobFilter
 
     @filter_applied_jobs_docs()
+    @cache_response(key_prefix="filter_applied_jobs", timeout=60 * 60 * 24, scope=SCOPE_USER,
+                    families=[user_family("filter_applied_jobs")])
     def get(self, request):
         current_user = request.user
 
-        # Serialize query parameters to use in the cache key
-        query_params = request.GET.urlencode()
-        cache_key = f"filter_applied_jobs_{current_user.id}_{query_params}"
-
-        # Check if cached data exists
-        cached_data = get_cached_data(cache_key=cache_key)
-        if cached_data:
-            return CustomResponse.success(message="Retrieved successfully", data=cached_data)
-
-        queryset = AppliedJob.objects.filter(user=current_user).order_by('-created')
+        queryset = AppliedJob.objects.for_listing().filter(user=current_user).order_by('-created')
         filtered_queryset = self.filterset_class(data=request.GET, queryset=queryset).qs
+        page = CursorPagination().paginate_queryset(filtered_queryset, request)
 
-        data = filter_applied_jobs_data(queryset=filtered_queryset)
-
-        # Set cache data
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60 * 24)
-
-        return CustomResponse.success(message="Retrieved successfully", data=data)
+        page["items"] = filter_applied_jobs_data(queryset=page["items"])
+        return CustomResponse.success(message="Retrieved successfully", data=page)
 
 
 class CreateDeleteSavedJobsView(APIView):
@@ -215,24 +184,14 @@ class RetrieveAllSavedJobsView(APIView):
     permission_classes = (IsAuthenticatedEmployee,)
 
     @retrieve_all_saved_jobs_docs()
+    @cache_response(key_prefix="retrieve_saved_jobs", timeout=60 * 60 * 24, scope=SCOPE_USER,
+                    families=[user_family("retrieve_saved_jobs")])
     def get(self, request):
-        current_user = request.user
-
-        # Set key for query_param search results
-        cache_key = f"retrieve_saved_jobs_{current_user.id}"
-
-        # Check if cached data exists
-        cached_data = get_cached_data(cache_key)
-        if cached_data:
-            return CustomResponse.success(message="Successfully retrieved saved jobs", data=cached_data)
-
-        saved_jobs = SavedJob.objects.select_related('job', 'user').filter(user=request.user)
-
-        data = get_saved_jobs_data(saved_jobs=saved_jobs, current_user=request.user)
-
-        # Set cache data
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60 * 24)
+        saved_jobs = SavedJob.objects.for_listing().filter(user=request.user)
+        page = CursorPagination().paginate_queryset(saved_jobs, request)
 
+        data = get_saved_jobs_data(saved_jobs=page["items"])
+        data["next_cursor"] = page["next_cursor"]
         return CustomResponse.success(message="Successfully retrieved saved jobs", data=data)
 
 
@@ -248,7 +207,7 @@ class SearchVacanciesView(APIView):
     def get(self, request, *args, **kwargs):
         search = request.query_params.get('search', '')
 
-        data = get_search_vacancies(search=search)
+        data = get_search_vacancies(request=request, search=search)
         return CustomResponse.success(message="Successfully retrieved searched vacancies", data=data)
 
 
@@ -258,29 +217,19 @@ class VacanciesHomeView(APIView):
     filterset_class = VacanciesFilter
 
     @vacancies_home_docs()
+    @cache_response(key_prefix="retrieve_vacancies", timeout=60 * 60, scope=SCOPE_USER, stale=True,
+                    families=[user_family("retrieve_vacancies")])
     def get(self, request):
-        # Get query param
-        query_params = request.GET.urlencode()
-
-        # Set key for query_param search results
-        cache_key = f"retrieve_vacancies_{query_params}"
-
-        # Return cached data if it exists
-        cached_data = get_cached_data(cache_key=cache_key)
-        if cached_data:
-            return CustomResponse.success(message="Retrieved successfully", data=cached_data)
-
         profile_name = request.user.company_profile.name
 
-        my_vacancies = Job.objects.filter(recruiter=request.user).order_by('-created')
-        all_applied_jobs = AppliedJob.objects.filter(job__recruiter=request.user).order_by('-created')
+        my_vacancies = Job.objects.for_listing().filter(recruiter=request.user).order_by('-created')
+        all_applied_jobs = AppliedJob.objects.for_listing().filter(job__recruiter=request.user).order_by('-created')
 
         queryset = self.filterset_class(data=request.GET, queryset=my_vacancies).qs
+        page = CursorPagination().paginate_queryset(queryset, request)
 
-        data = vacancies_home_data(queryset=queryset, profile_name=profile_name, applied_jobs=all_applied_jobs)
-
-        # Set cache data
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60)
+        data = vacancies_home_data(queryset=page["items"], profile_name=profile_name, applied_jobs=all_applied_jobs)
+        data["next_cursor"] = page["next_cursor"]
         return CustomResponse.success(message="Retrieved successfully", data=data)
 
 
@@ -289,24 +238,14 @@ class RetrieveAllJobTypesView(APIView):
 
     @retrieve_all_job_types_docs()
     def get(self, request):
-        cache_key = "retrieve_job_types"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        if cached_data:
-            return CustomResponse.success(message="Successfully retrieved all job types", data=cached_data)
-
-        job_types = JobType.objects.only('id', 'name')
-
         data = [
             {
                 "id": job_type.id,
                 "name": job_type.name
             }
-            for job_type in job_types
+            for job_type in reference_data.get().job_types
         ]
 
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60 * 24 * 7)
-
         return CustomResponse.success(message="Successfully retrieved all job types", data=data)
 
 
@@ -348,7 +287,8 @@ class UpdateDeleteVacancyView(APIView):
         serializer.is_valid(raise_exception=True)
         serialized_data = serializer.validated_data
 
-        requirements_data = serialized_data.pop('requirements', [])
+        # Requirements are left as they are unless the payload has them
+        requirements_data = serialized_data.pop('requirements', None)
 
         data = update_vacancy_data(serialized_data=serialized_data, requirements_data=requirements_data,
                                    job_instance=job_instance)
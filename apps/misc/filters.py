@@ -1,11 +1,11 @@
 from django_filters import FilterSet, filters
 
-from apps.misc.models import FAQType
+from apps.common.reference_data import reference_data
 
 
 class FAQFilter(FilterSet):
     type = filters.ChoiceFilter(
         field_name='type__name',
         lookup_expr='exact',
-        choices=lambda: [(type_obj.name, type_obj.name) for type_obj in FAQType.objects.all()]
+        choices=lambda: [(name, name) for name in reference_data.get().faq_types_by_name]
     )
@@ -1,6 +1,7 @@
 from django.db import models
 
 from apps.common.models import BaseModel
+from utilities.query_cache import CachedManager
 
 
 # Create your models here.
@@ -13,6 +14,8 @@ class Tip(BaseModel):
     author_image = models.ImageField(upload_to="static/tip_author", null=True, blank=True)
     position = models.CharField(max_length=255, null=True, blank=True)
 
+    objects = CachedManager()
+
     @property
     def author_image_url(self):
         return self.author_image.url if self.author_image else ""
@@ -24,6 +27,8 @@ class Tip(BaseModel):
 class FAQType(BaseModel):
     name = models.CharField(max_length=255)
 
+    objects = CachedManager()
+
     def __str__(self):
         return self.name
 
@@ -33,5 +38,7 @@ class FAQ(BaseModel):
     type = models.ForeignKey(FAQType, on_delete=models.CASCADE, related_name="faqs", blank=True, null=True)
     answer = models.TextField()
 
+    objects = CachedManager()
+
     def __str__(self):
         return self.question
@@ -1,8 +1,8 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from apps.misc.models import Tip, FAQ
-from utilities.caching import clear_cache
+from apps.misc.models import Tip, FAQ, FAQType
+from utilities.caching import clear_cache, clear_not_found
 
 
 @receiver(post_save, sender=Tip)
@@ -27,3 +27,29 @@ def clear_faqs_cache(sender, **kwargs):
     :return:
     """
     clear_cache(cache_key_prefixes=["retrieve_faqs"])
+
+
+@receiver(post_save, sender=FAQType)
+@receiver(post_delete, sender=FAQType)
+def clear_faq_types_cache(sender, **kwargs):
+    """
+    Clear cache when a FAQ type is created or deleted
+    :param sender:
+    :param kwargs:
+    :return:
+    """
+    clear_cache(cache_key_prefixes=["retrieve_faq_types", "retrieve_faqs"])
+
+
+@receiver(post_save, sender=Tip)
+def clear_tip_not_found_cache(sender, instance, created, **kwargs):
+    """
+    Forget cached misses for a tip once it is created
+    :param sender:
+    :param instance:
+    :param created:
+    :param kwargs:
+    :return:
+    """
+    if created:
+        clear_not_found(Tip, id=instance.id)
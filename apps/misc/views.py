@@ -5,12 +5,13 @@ from rest_framework.views import APIView
 from apps.common.errors import ErrorCode
 from apps.common.exceptions import RequestError
 from apps.common.permissions import IsAuthenticatedEmployee
+from apps.common.reference_data import reference_data
 from apps.common.responses import CustomResponse
 from apps.misc.docs.docs import *
 from apps.misc.filters import FAQFilter
 from apps.misc.models import Tip, FAQ, FAQType
 from apps.misc.serializers import TipSerializer
-from utilities.caching import get_cached_data, set_cached_data
+from utilities.caching import cache_response, get_or_none_cached
 
 
 # Create your views here.
@@ -20,13 +21,8 @@ class RetrieveAllTipsView(APIView):
     permission_classes = (IsAuthenticatedEmployee,)
 
     @retrieve_all_tips_docs()
+    @cache_response(key_prefix="retrieve_tips", timeout=60 * 60 * 24 * 5, local=True)
     def get(self, request):
-        cache_key = "retrieve_tips"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        if cached_data:
-            return CustomResponse.success(message="Tips retrieved successfully", data=cached_data)
-
         tips = Tip.objects.only('title').order_by('-created')
 
         data = [
@@ -38,8 +34,6 @@ class RetrieveAllTipsView(APIView):
             for tip in tips
         ]
 
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60 * 24 * 5)
-
         return CustomResponse.success(message="Tips retrieved successfully", data=data)
 
 
@@ -47,25 +41,16 @@ class RetrieveTipView(APIView):
     permission_classes = (IsAuthenticatedEmployee,)
 
     @retrieve_tip_docs()
+    @cache_response(key_prefix="retrieve_tip", timeout=60 * 60 * 24 * 5, local=True)
     def get(self, request, *args, **kwargs):
         tip_id = kwargs.get('tip_id')
 
-        cache_key = f"retrieve_tip_{tip_id}"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        if cached_data:
-            return CustomResponse.success(message="Tip retrieved successfully", data=cached_data)
-
-        try:
-            tip = Tip.objects.get(id=tip_id)
-        except Tip.DoesNotExist:
+        tip = get_or_none_cached(Tip, id=tip_id)
+        if tip is None:
             raise RequestError(err_code=ErrorCode.NON_EXISTENT, err_msg="No tip found for this id",
                                status_code=status.HTTP_404_NOT_FOUND)
 
         data = TipSerializer(tip).data
-
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60 * 24 * 5)
-
         return CustomResponse.success(message="Tip retrieved successfully", data=data)
 
 
@@ -74,24 +59,14 @@ class RetrieveAllFAQTypesView(APIView):
 
     @retrieve_all_faq_types_docs()
     def get(self, request):
-        cache_key = "retrieve_faqs_types"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        if cached_data:
-            return CustomResponse.success(message="FAQ types retrieved successfully", data=cached_data)
-
-        queryset = FAQType.objects.only('id', 'name')
-
         data = [
             {
                 "id": faq_type.id,
                 "name": faq_type.name
             }
-            for faq_type in queryset
+            for faq_type in reference_data.get().faq_types
         ]
 
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60 * 24 * 7)
-
         return CustomResponse.success(message="FAQ types retrieved successfully", data=data)
 
 
@@ -101,14 +76,8 @@ class FilterAllFAQsView(APIView):
     filter_backends = [DjangoFilterBackend]
 
     @filter_all_faqs_docs()
+    @cache_response(key_prefix="retrieve_faqs", timeout=60 * 60 * 24 * 7, local=True)
     def get(self, request):
-        query_params = request.GET.urlencode()
-        cache_key = f"retrieve_faqs_{query_params}"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        if cached_data:
-            return CustomResponse.success(message="FAQs filtered successfully", data=cached_data)
-
         queryset = FAQ.objects.select_related('type').all().order_by('question')
         queryset = self.filterset_class(data=request.GET, queryset=queryset).qs
         data = [
@@ -120,5 +89,4 @@ class FilterAllFAQsView(APIView):
             for faq in queryset
         ]
 
-        set_cached_data(cache_key=cache_key, data=data, timeout=60 * 60 * 24 * 7)
         return CustomResponse.success(message="FAQs filtered successfully", data=data)
@@ -1,4 +1,5 @@
-from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, OpenApiParameter
 from rest_framework import status
 
 
@@ -12,6 +13,11 @@ def notification_docs():
             JOB_APPLIED, NEW_JOB_AVAILABLE, APPLICATION_ACCEPTED, APPLICATION_REJECTED``` 
             """
         ),
+        parameters=[
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, required=False,
+                             description="next_cursor of the previous page"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, required=False),
+        ],
         tags=['Notification'],
         responses={
             status.HTTP_200_OK: OpenApiResponse(
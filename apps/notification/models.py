@@ -16,6 +16,12 @@ class Notification(BaseModel):
     notification_type = models.CharField(max_length=255, choices=NOTIFICATION_TYPE)
     message = models.TextField(null=True, blank=True)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            # Notifications of a user, newest first
+            models.Index(fields=['user', '-created', '-id'], name='notification_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Notification by {self.user.email} : {self.message}"
 
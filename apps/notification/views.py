@@ -1,10 +1,11 @@
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
+from apps.common.paginator import CursorPagination
 from apps.common.responses import CustomResponse
 from apps.notification.docs.docs import notification_docs
 from apps.notification.models import Notification
-from utilities.caching import get_cached_data, set_cached_data
+from utilities.caching import cache_response, user_family, SCOPE_USER
 
 
 # Create your views here.
@@ -13,30 +14,23 @@ class RetrieveAllNotificationsView(APIView):
     permission_classes = (IsAuthenticated,)
 
     @notification_docs()
+    @cache_response(key_prefix="all_notifications", timeout=60 * 60, scope=SCOPE_USER,
+                    families=[user_family("all_notifications")])
     def get(self, request):
         user = request.user
 
-        # Set cache key
-        cache_key = f"all_notifications_{user.id}"
-        cached_data = get_cached_data(cache_key=cache_key)
-
-        # Retrieve data from cache if it exists
-        if cached_data:
-            return CustomResponse.success(message="Successfully retrieved all notifications", data=cached_data)
-
-        # Get all notifications
-        notifications = Notification.objects.select_related("user").filter(user=user)
+        # Get the requested page of notifications
+        notifications = Notification.objects.filter(user=user)
+        page = CursorPagination().paginate_queryset(notifications, request)
 
         # Create a list of dictionaries containing notification details
-        data = [
+        page["items"] = [
             {
                 "id": single_notification.id,
                 "notification_type": single_notification.notification_type,
                 "message": single_notification.message
             }
-            for single_notification in notifications
+            for single_notification in page["items"]
         ]
 
-        # Cache the data
-        set_cached_data(cache_key, data, 60 * 60)
-        return CustomResponse.success(message="Successfully retrieved all notifications", data=data)
+        return CustomResponse.success(message="Successfully retrieved all notifications", data=page)
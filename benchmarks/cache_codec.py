@@ -0,0 +1,67 @@
+"""
+Compare the cache codecs on a realistic jobs home feed.
+
+Usage: python benchmarks/cache_codec.py [number_of_jobs]
+"""
+import os
+import random
+import sys
+import timeit
+from decimal import Decimal
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.cache_codec import MsgpackCodec, PickleCodec  # noqa: E402
+
+COMPANIES = [(uuid4(), f"Company {index}") for index in range(50)]
+JOB_TYPES = ["Full Time", "Part Time", "Contract", "Internship", "Remote"]
+COUNTRIES = ["Nigeria", "United States", "United Kingdom", "Germany", "Canada", "Ghana", "Kenya"]
+
+
+def build_home_feed(number_of_jobs: int) -> dict:
+    """
+        Same shape as apps.jobs.selectors.job_home_data
+    """
+    return {
+        "profile_name": "John Doe",
+        "tip": {"id": uuid4(), "title": "Prepare for your interview", "author_image": "/static/tip_author/a.jpg"},
+        "job_types": [{"id": uuid4(), "name": name} for name in JOB_TYPES],
+        "jobs": [
+            {
+                "id": uuid4(),
+                "title": f"{random.choice(['Senior', 'Junior', 'Lead'])} Software Engineer {index}",
+                "recruiter": {"id": company_id, "name": company_name},
+                "job_image": f"/static/jobs/{index}.png",
+                "location": random.choice(COUNTRIES),
+                "type": random.choice(JOB_TYPES),
+                "salary": Decimal(random.randint(100000, 9999999)) / 100,
+                "is_saved": random.random() < 0.1,
+            }
+            for index, (company_id, company_name) in enumerate(random.choices(COMPANIES, k=number_of_jobs))
+        ],
+    }
+
+
+def run(number_of_jobs: int, repeat: int = 50) -> None:
+    feed = build_home_feed(number_of_jobs)
+    codecs = {
+        "pickle (backend default)": PickleCodec(),
+        "msgpack": MsgpackCodec(compress_threshold=sys.maxsize),
+        "msgpack + zlib": MsgpackCodec(),
+    }
+
+    print(f"Jobs home feed with {number_of_jobs} jobs, best of {repeat} runs\n")
+    print(f"{'codec':<26}{'size (KiB)':>12}{'encode (ms)':>14}{'decode (ms)':>14}")
+
+    for name, codec in codecs.items():
+        payload = codec.dumps(feed)
+        assert codec.loads(payload) == feed
+
+        encode = min(timeit.repeat(lambda: codec.dumps(feed), number=1, repeat=repeat)) * 1000
+        decode = min(timeit.repeat(lambda: codec.loads(payload), number=1, repeat=repeat)) * 1000
+        print(f"{name:<26}{len(payload) / 1024:>12.1f}{encode:>14.2f}{decode:>14.2f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,35 @@
+"""
+Compare resolving job locations through pycountry with the precomputed country name table on a jobs home feed.
+
+Usage: python benchmarks/country_names.py [number_of_jobs]
+"""
+import os
+import random
+import sys
+import timeit
+
+import pycountry
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.common.choices import COUNTRY_NAMES  # noqa: E402
+
+
+def run(number_of_jobs: int, repeat: int = 50) -> None:
+    locations = random.choices(list(COUNTRY_NAMES), k=number_of_jobs)
+    lookups = {
+        "pycountry.countries.get": lambda: [pycountry.countries.get(alpha_2=location).name for location in locations],
+        "COUNTRY_NAMES": lambda: [COUNTRY_NAMES.get(location) for location in locations],
+    }
+    assert lookups["pycountry.countries.get"]() == lookups["COUNTRY_NAMES"]()
+
+    print(f"Jobs home feed with {number_of_jobs} jobs, best of {repeat} runs\n")
+    print(f"{'lookup':<26}{'feed (ms)':>12}{'per row (us)':>14}")
+
+    for name, lookup in lookups.items():
+        feed = min(timeit.repeat(lookup, number=1, repeat=repeat))
+        print(f"{name:<26}{feed * 1000:>12.3f}{feed / number_of_jobs * 1000000:>14.3f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,105 @@
+import pickle
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from uuid import UUID, SafeUUID
+
+import msgpack
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_COMPRESS_THRESHOLD = 1024
+
+# msgpack extension type codes
+EXT_DECIMAL = 1
+EXT_UUID = 2
+EXT_DATETIME = 3
+EXT_DATE = 4
+
+# Leading byte of every encoded payload, telling the decoder how the rest was written
+FORMAT_MSGPACK = b"m"
+FORMAT_MSGPACK_COMPRESSED = b"z"
+FORMAT_PICKLE = b"p"
+
+
+class PickleCodec:
+    """
+        Stores payloads the way the cache backend would on its own.
+    """
+
+    def dumps(self, value) -> bytes:
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, payload: bytes):
+        return pickle.loads(payload)
+
+
+class MsgpackCodec:
+    """
+        Stores payloads as msgpack, with extension types for the values our selectors return
+        (Decimal salaries, UUID ids, datetimes). Payloads above the threshold are zlib compressed.
+        Anything msgpack cannot represent falls back to pickle.
+    """
+
+    def __init__(self, compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD):
+        self.compress_threshold = compress_threshold
+
+    @staticmethod
+    def _default(value):
+        if isinstance(value, Decimal):
+            return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+        if isinstance(value, UUID):
+            return msgpack.ExtType(EXT_UUID, value.bytes)
+        # datetime is a subclass of date, so it has to be checked first
+        if isinstance(value, datetime):
+            return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+        if isinstance(value, date):
+            return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes):
+        if code == EXT_UUID:
+            # Skips UUID.__init__ validation, the bytes were produced by UUID.bytes. Feeds hold two ids per job,
+            # so this is the hottest path when decoding
+            uuid = object.__new__(UUID)
+            object.__setattr__(uuid, "int", int.from_bytes(data, "big"))
+            object.__setattr__(uuid, "is_safe", SafeUUID.unknown)
+            return uuid
+        if code == EXT_DECIMAL:
+            return Decimal(data.decode())
+        if code == EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == EXT_DATE:
+            return date.fromisoformat(data.decode())
+        return msgpack.ExtType(code, data)
+
+    def dumps(self, value) -> bytes:
+        try:
+            payload = msgpack.packb(value, default=self._default, use_bin_type=True)
+        except TypeError:
+            return FORMAT_PICKLE + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        if len(payload) > self.compress_threshold:
+            return FORMAT_MSGPACK_COMPRESSED + zlib.compress(payload, 1)
+        return FORMAT_MSGPACK + payload
+
+    def loads(self, payload: bytes):
+        data_format, payload = payload[:1], payload[1:]
+
+        if data_format == FORMAT_PICKLE:
+            return pickle.loads(payload)
+        if data_format == FORMAT_MSGPACK_COMPRESSED:
+            payload = zlib.decompress(payload)
+        return msgpack.unpackb(payload, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+@lru_cache(maxsize=None)
+def get_cache_codec():
+    """
+        Return the codec configured in the CACHE_CODEC setting.
+    """
+    codec_settings = getattr(settings, "CACHE_CODEC", {})
+    codec_class = import_string(codec_settings.get("BACKEND", "utilities.cache_codec.MsgpackCodec"))
+    return codec_class(**codec_settings.get("OPTIONS", {}))
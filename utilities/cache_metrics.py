@@ -0,0 +1,100 @@
+import re
+import threading
+from bisect import bisect_left
+
+# Upper bounds, in milliseconds, of the latency histogram buckets. A last bucket counts everything slower.
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+# Keys of these kinds are named after the key or family they belong to, e.g. "stale:retrieve_jobs:all:..."
+KEY_KINDS = ("stale", "rebuild_lock", "cache_version", "not_found", "query")
+
+# Trailing user ids and client addresses, so that every user's "filter_applied_jobs_<user_id>" is reported as
+# one family
+_USER_SUFFIX = re.compile(
+    r"_([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{32}|\d+|[0-9a-f.:]*[.:][0-9a-f.:]+)$"
+)
+
+
+def key_family(cache_key: str) -> str:
+    """
+        Name of the family a cache key or family name is reported under.
+
+        :param cache_key: A key as passed to the cache, or the name of a cache family.
+        :return: The family name, without user ids.
+    """
+    kind, _, rest = cache_key.partition(":")
+
+    if kind in KEY_KINDS and rest:
+        return f"{kind}:{key_family(rest)}"
+    return _USER_SUFFIX.sub("", kind)
+
+
+class CacheMetrics:
+    """
+        Per-process hit, miss, set and invalidation counters and latency histograms, grouped by key family.
+    """
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _family(self, cache_key: str) -> dict:
+        family = key_family(cache_key)
+
+        if family not in self._families:
+            self._families[family] = {
+                "hits": 0,
+                "misses": 0,
+                "sets": 0,
+                "invalidations": 0,
+                "get_latency": [0] * (len(LATENCY_BUCKETS) + 1),
+                "set_latency": [0] * (len(LATENCY_BUCKETS) + 1),
+            }
+        return self._families[family]
+
+    def record_get(self, cache_key: str, hit: bool, duration: float) -> None:
+        with self._lock:
+            family = self._family(cache_key)
+            family["hits" if hit else "misses"] += 1
+            family["get_latency"][bisect_left(LATENCY_BUCKETS, duration * 1000)] += 1
+
+    def record_set(self, cache_key: str, duration: float) -> None:
+        with self._lock:
+            family = self._family(cache_key)
+            family["sets"] += 1
+            family["set_latency"][bisect_left(LATENCY_BUCKETS, duration * 1000)] += 1
+
+    def record_invalidations(self, families) -> None:
+        with self._lock:
+            for family in families:
+                self._family(family)["invalidations"] += 1
+
+    def snapshot(self) -> list:
+        """
+            Copy of the metrics recorded so far.
+
+            :return: One dict per family, sorted by family name, with its hit ratio worked out.
+        """
+        with self._lock:
+            families = [
+                {
+                    **stats,
+                    "family": family,
+                    "get_latency": list(stats["get_latency"]),
+                    "set_latency": list(stats["set_latency"]),
+                }
+                for family, stats in self._families.items()
+            ]
+
+        for stats in families:
+            reads = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / reads if reads else None
+
+        return sorted(families, key=lambda stats: stats["family"])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._families.clear()
+
+
+cache_metrics = CacheMetrics()
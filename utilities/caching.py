@@ -1,49 +1,440 @@
-from django.conf import settings
+import hashlib
+import random
+import threading
+import time
+from functools import wraps
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from asgiref.local import Local
 from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import Signal
+from django.test import RequestFactory
+from django.utils.http import parse_etags, quote_etag
+from redis.exceptions import RedisError
+from rest_framework import status
+from rest_framework.response import Response
+
+from utilities.cache_codec import get_cache_codec
+from utilities.cache_metrics import cache_metrics
+from utilities.circuit_breaker import CircuitBreaker
+from utilities.local_cache import local_cache, get_redis_client
+
+# Every cache family (e.g. "retrieve_jobs" or "filter_applied_jobs_<user_id>") owns a generation counter stored
+# under this prefix. Keys embed the current generation of their families, so bumping a counter orphans every
+# key of that family at once without walking the key space.
+CACHE_VERSION_PREFIX = "cache_version"
+
+# Single-flight rebuilds: the lock expires on its own if the worker holding it dies, and waiters give up polling
+# and build the data themselves once the wait timeout is over.
+REBUILD_LOCK_TIMEOUT = 10
+REBUILD_WAIT_TIMEOUT = 5
+REBUILD_POLL_INTERVAL = 0.05
+
+# How long the last built value of a key is kept around to be served while it is being rebuilt.
+STALE_DATA_TIMEOUT = 60 * 60 * 24
+
+# Timeouts are stretched by up to this fraction so that keys cached together do not all expire together.
+CACHE_TIMEOUT_JITTER = 0.1
+
+# Returned by get_cached_data on a miss when asked to, so that cached empty results (None, [], {}) count as hits.
+CACHE_MISS = object()
+
+# Lookups that found nothing are remembered this long, so repeated misses skip the database.
+NOT_FOUND_TIMEOUT = 60
+
+# Skips the cache backend while it is failing, so that requests are served from the database instead of piling
+# up behind Redis timeouts.
+cache_breaker = CircuitBreaker()
+
+# Families whose invalidation could not reach the backend, bumped once it is reachable again
+_unflushed_families = set()
+_unflushed_families_lock = threading.Lock()
+
+# Sent with the invalidated families once their generations have been bumped
+cache_invalidated = Signal()
+
+# Families invalidated inside the current transaction, waiting for it to commit
+_pending_invalidations = Local()
+
+# Generation of every family whose real one cannot be read from the backend. Stable within the process, so
+# callers comparing generations do not see a change on every call during an outage, and rotated whenever this
+# worker invalidates families it cannot reach, so its own writes still take effect.
+UNAVAILABLE_VERSION_PREFIX = "unavailable-"
+_unavailable_version = f"{UNAVAILABLE_VERSION_PREFIX}{uuid4().hex}"
+
+# Key scopes for cached views
+SCOPE_USER = "user"
+SCOPE_ROLE = "role"
+
+
+def _version_key(family: str) -> str:
+    return f"{CACHE_VERSION_PREFIX}:{family}"
+
+
+def _new_version() -> int:
+    # Seeded from the clock so a counter that gets evicted never restarts at a generation that is still cached.
+    return time.time_ns() // 1000
+
+
+def call_cache(operation, default=None):
+    """
+        Run a cache backend call through the circuit breaker.
+
+        :param operation: Callable making the backend call.
+        :param default: Returned when the breaker is open or the call fails.
+        :return: The result of the call, or the default.
+    """
+    if not cache_breaker.allow():
+        return default
+
+    try:
+        result = operation()
+    except RedisError:
+        cache_breaker.record_failure()
+        return default
+    except Exception:
+        # Still settles a half-open probe, which would otherwise keep the breaker open for good
+        cache_breaker.record_failure()
+        raise
+
+    cache_breaker.record_success()
+    return result
+
+
+def get_cache_versions(families: list) -> dict:
+    """
+        Retrieve the current generation of each cache family, initialising the missing ones.
+        Generations are served from the local cache and only fetched from the backend when missing there.
+        When the backend is unavailable, missing generations get a per-process placeholder so keys built from them
+        are never shared between workers.
+
+        :param families: Names of the cache families.
+        :return: A mapping of family name to its generation.
+    """
+    version_keys = {_version_key(family): family for family in families}
+
+    stored_versions = {}
+    for version_key in version_keys:
+        version = local_cache.get(version_key)
+        if version is not None:
+            stored_versions[version_key] = version
+
+    missing_keys = [version_key for version_key in version_keys if version_key not in stored_versions]
+    if missing_keys:
+        fetched_versions = call_cache(lambda: cache.get_many(missing_keys))
+
+        if fetched_versions is None:
+            return {
+                family: stored_versions.get(version_key, _unavailable_version)
+                for version_key, family in version_keys.items()
+            }
+        stored_versions.update(fetched_versions)
+
+    versions = {}
+    for version_key, family in version_keys.items():
+        version = stored_versions.get(version_key)
+
+        if version is None:
+            version = _new_version()
+
+            # Another worker may have initialised the counter in the meantime, theirs wins
+            added = call_cache(lambda: cache.add(version_key, version, timeout=None))
+            if added is None:
+                versions[family] = _unavailable_version
+                continue
+            if not added:
+                version = call_cache(lambda: cache.get(version_key, version), default=version)
+
+        local_cache.set(version_key, version)
+        versions[family] = version
+
+    return versions
+
+
+def is_version_unavailable(version) -> bool:
+    """
+        Whether a generation returned by get_cache_versions is a placeholder for one the backend could not serve.
+    """
+    return str(version).startswith(UNAVAILABLE_VERSION_PREFIX)
+
+
+def make_cache_key(cache_key: str, families: list) -> str:
+    """
+        Build a cache key that carries the current generation of the families it belongs to.
+
+        :param cache_key: The base key for the cached data.
+        :param families: Cache families whose invalidation must also invalidate this key.
+        :return: The versioned cache key.
+    """
+    versions = get_cache_versions(families)
+    version_tag = ".".join(str(versions[family]) for family in families)
+    return f"{cache_key}:{version_tag}"
+
+
+def _encode(data) -> bytes:
+    return get_cache_codec().dumps(data)
+
 
+def _decode(payload):
+    # Entries written before payloads went through the codec are returned as they are
+    if not isinstance(payload, bytes):
+        return payload
+    return get_cache_codec().loads(payload)
 
-def get_cached_data(cache_key: str):
+
+def get_cached_data(cache_key: str, local: bool = False, default=None):
     """
         Retrieve cached data by cache key.
 
         :param cache_key: The key for the cached data.
-        :return: The cached data or None if not found.
+        :param local: Look the key up in the in-process cache before going to the backend.
+        :param default: Returned when the key is not cached. Pass CACHE_MISS to tell misses from cached empty data.
+        :return: The cached data or the default if not found.
     """
-    cached_data = cache.get(cache_key)
+    started = time.perf_counter()
+
+    if local:
+        cached_data = local_cache.get(cache_key, CACHE_MISS)
+        if cached_data is not CACHE_MISS:
+            cache_metrics.record_get(cache_key, hit=True, duration=time.perf_counter() - started)
+            return cached_data
+
+    payload = call_cache(lambda: cache.get(cache_key, CACHE_MISS), default=CACHE_MISS)
+    if payload is CACHE_MISS:
+        cache_metrics.record_get(cache_key, hit=False, duration=time.perf_counter() - started)
+        return default
+
+    cached_data = _decode(payload)
+    cache_metrics.record_get(cache_key, hit=True, duration=time.perf_counter() - started)
+
+    if local:
+        local_cache.set(cache_key, cached_data)
     return cached_data
 
 
-def set_cached_data(cache_key: str, data, timeout: int):
+def set_cached_data(cache_key: str, data, timeout: int, local: bool = False):
     """
         Set data in the cache with a given key and timeout.
 
         :param cache_key: The key for the cache entry.
         :param data: The data to cache.
+        :param timeout: Time in seconds for the cache to expire, stretched by a random jitter.
+        :param local: Also keep the data in the in-process cache. Only meant for hot, read-mostly keys.
+    """
+    if timeout:
+        timeout += random.randint(0, int(timeout * CACHE_TIMEOUT_JITTER))
+
+    started = time.perf_counter()
+    call_cache(lambda: cache.set(cache_key, _encode(data), timeout))
+    cache_metrics.record_set(cache_key, duration=time.perf_counter() - started)
+
+    if local:
+        local_cache.set(cache_key, data)
+
+
+def get_or_build_cached_data(cache_key: str, build, timeout: int, stale_key: str = None, local: bool = False):
+    """
+        Retrieve cached data, building it on a miss with a single worker at a time.
+
+        The first worker to miss takes a short lock and builds the data while the others wait for it to land in
+        the cache. When a stale key is given, waiters serve the last built value instead of waiting.
+
+        :param cache_key: The key for the cached data.
+        :param build: Callable returning the data to cache.
         :param timeout: Time in seconds for the cache to expire.
+        :param stale_key: Unversioned key under which the last built value is kept (stale-while-revalidate).
+        :param local: Also use the in-process cache for this key.
+        :return: The cached or freshly built data.
     """
-    cache.set(cache_key, data, timeout)
+    data, _ = _get_or_build_cached_data(cache_key=cache_key, build=build, timeout=timeout, stale_key=stale_key,
+                                        local=local)
+    return data
 
 
-def clear_cache(cache_key_prefixes: list) -> None:
+def _get_or_build_cached_data(cache_key: str, build, timeout: int, stale_key: str = None,
+                              local: bool = False) -> tuple:
+    # Also tells whether the data is a stale value served while another worker rebuilds it
+    cached_data = get_cached_data(cache_key=cache_key, local=local, default=CACHE_MISS)
+    if cached_data is not CACHE_MISS:
+        return cached_data, False
+
+    lock_key = f"rebuild_lock:{cache_key}"
+    lock_token = uuid4().hex
+
+    locked = call_cache(lambda: cache.add(lock_key, lock_token, timeout=REBUILD_LOCK_TIMEOUT))
+
+    # The backend is unavailable, serve straight from the database
+    if locked is None:
+        return build(), False
+
+    if not locked:
+        if stale_key is not None:
+            stale_data = get_cached_data(cache_key=f"stale:{stale_key}", default=CACHE_MISS)
+            if stale_data is not CACHE_MISS:
+                return stale_data, True
+
+        deadline = time.monotonic() + REBUILD_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(REBUILD_POLL_INTERVAL)
+
+            cached_data = get_cached_data(cache_key=cache_key, local=local, default=CACHE_MISS)
+            if cached_data is not CACHE_MISS:
+                return cached_data, False
+
+            # The builder gave up without caching anything, stop waiting for it
+            if call_cache(lambda: cache.get(lock_key)) is None:
+                break
+
+        return build(), False
+
+    try:
+        data = build()
+        set_cached_data(cache_key=cache_key, data=data, timeout=timeout, local=local)
+
+        if stale_key is not None:
+            set_cached_data(cache_key=f"stale:{stale_key}", data=data, timeout=STALE_DATA_TIMEOUT)
+    finally:
+        if call_cache(lambda: cache.get(lock_key)) == lock_token:
+            call_cache(lambda: cache.delete(lock_key))
+
+    return data, False
+
+
+def _bump_cache_versions(families) -> None:
+    global _unavailable_version
+
+    # Invalidations that could not reach the backend earlier go out with this batch
+    with _unflushed_families_lock:
+        families = set(families) | _unflushed_families
+        _unflushed_families.clear()
+
+    version_keys = [_version_key(family) for family in families]
+
+    if not call_cache(lambda: _increment_cache_versions(version_keys), default=False):
+        # Until the generations are bumped, keys built before the outage are still reachable in the backend.
+        # Forgetting the generations locally keeps this worker away from them in the meantime.
+        local_cache.delete(version_keys)
+
+        with _unflushed_families_lock:
+            _unflushed_families.update(families)
+            _unavailable_version = f"{UNAVAILABLE_VERSION_PREFIX}{uuid4().hex}"
+        return None
+
+    cache_metrics.record_invalidations(families)
+    cache_invalidated.send(sender=None, families=families)
+    return None
+
+
+def _flush_unflushed_families() -> None:
+    with _unflushed_families_lock:
+        pending = bool(_unflushed_families)
+
+    if pending:
+        _bump_cache_versions(set())
+
+
+cache_breaker.on_recovery(_flush_unflushed_families)
+
+
+def _increment_cache_versions(version_keys: list) -> bool:
+    # Data keys are immutable per generation, so dropping the generations from every worker is enough
+    client = get_redis_client()
+
+    if client is None:
+        for version_key in version_keys:
+            try:
+                cache.incr(version_key)
+            except ValueError:
+                # The counter was never initialised or has been evicted, start a fresh generation
+                cache.set(version_key, _new_version(), timeout=None)
+
+        local_cache.broadcast_delete(version_keys)
+        return True
+
+    # One round trip for the whole batch
+    redis_keys = [cache.make_and_validate_key(version_key) for version_key in version_keys]
+    with client.pipeline(transaction=False) as pipeline:
+        for redis_key in redis_keys:
+            pipeline.incr(redis_key)
+        local_cache.broadcast_delete(version_keys, pipeline=pipeline)
+        versions = pipeline.execute()[:len(redis_keys)]
+
+    # INCR starts missing counters at 1, move them to a fresh generation instead
+    restarted_keys = [redis_key for redis_key, version in zip(redis_keys, versions) if version == 1]
+    if restarted_keys:
+        client.mset({redis_key: _new_version() for redis_key in restarted_keys})
+
+    return True
+
+
+def _flush_pending_invalidations() -> None:
+    families = getattr(_pending_invalidations, "families", None)
+
+    if families:
+        _pending_invalidations.families = set()
+        _bump_cache_versions(families)
+
+
+def invalidate_cache_families(families: list) -> None:
     """
-        Clear cache keys matching any of the given patterns.
+        Bump the generation of each family so that every key built for it becomes unreachable.
+
+        Inside a transaction the families are collected and bumped in a single batch once it commits, so readers
+        cannot repopulate the cache with uncommitted data and repeated saves only cost one round trip.
 
-        :param cache_key_prefixes: Variable number of cache key prefixes to match.
+        :param families: Names of the cache families to invalidate.
         :return: None
     """
+    if not transaction.get_connection().in_atomic_block:
+        _bump_cache_versions(set(families))
+        return None
 
-    # Fetch the Redis client
-    redis_client = cache._cache.get_client(1)
+    if getattr(_pending_invalidations, "families", None) is None:
+        _pending_invalidations.families = set()
+    _pending_invalidations.families.update(families)
 
-    # Iterate over each pattern and delete matching keys
-    for prefix in cache_key_prefixes:
-        pattern = f"*{settings.CACHES['default']['KEY_PREFIX']}*{prefix}*"
-        cache_keys = redis_client.keys(pattern)
+    # Registered on every call: callbacks of rolled back savepoints are dropped, so a single registration could
+    # be lost. Once the first callback has flushed the batch the others find nothing left to do.
+    transaction.on_commit(_flush_pending_invalidations)
+    return None
 
-        if cache_keys:
-            redis_client.delete(*cache_keys)
 
-    return None
+def is_invalidation_pending(families: list) -> bool:
+    """
+        Whether any of the families was invalidated in the current transaction, which has not committed yet.
+
+        :param families: Names of the cache families.
+        :return: True if reads for these families must bypass the cache.
+    """
+    # Families left over from a rolled back transaction are not pending anymore
+    if not transaction.get_connection().in_atomic_block:
+        return False
+
+    pending_families = getattr(_pending_invalidations, "families", None)
+    return bool(pending_families) and not pending_families.isdisjoint(families)
+
+
+def clear_cache(cache_key_prefixes: list) -> None:
+    """
+        Invalidate the cache families with the given names.
+
+        :param cache_key_prefixes: Names of the cache families to invalidate.
+        :return: None
+    """
+    invalidate_cache_families(families=cache_key_prefixes)
+
+
+def user_cache_family(user_id, pattern_string: str) -> str:
+    """
+        Name of the cache family holding a single user's entries.
+
+        :param user_id: The id of the user the entries belong to.
+        :param pattern_string: The name of the cache family.
+        :return: The user scoped family name.
+    """
+    return f"{pattern_string}_{user_id}"
 
 
 def clear_user_cache(user_id: str, pattern_string: str) -> None:
@@ -53,15 +444,194 @@ def clear_user_cache(user_id: str, pattern_string: str) -> None:
     :param pattern_string:
     :return:
     """
-    # Create the pattern to match keys containing the user's cache
-    pattern = f"*{pattern_string}_{user_id}*"
+    invalidate_cache_families(families=[user_cache_family(user_id=user_id, pattern_string=pattern_string)])
+
+
+def not_found_cache_key(model, **lookup) -> str:
+    params = urlencode(sorted((field, str(value)) for field, value in lookup.items()))
+    return f"not_found:{model._meta.label_lower}:{hashlib.md5(params.encode()).hexdigest()}"
+
+
+def get_or_none_cached(model, **lookup):
+    """
+        Fetch a single row, or None if there is none. Misses are cached for NOT_FOUND_TIMEOUT, so an unknown id
+        costs one cache read instead of a query until a matching row is created.
+
+        :param model: The model to look the row up in.
+        :param lookup: Field lookups identifying the row, the same ones clear_not_found is called with.
+        :return: The row, or None.
+    """
+    cache_key = not_found_cache_key(model, **lookup)
+
+    if get_cached_data(cache_key) is not None:
+        return None
+
+    try:
+        return model.objects.get(**lookup)
+    except model.DoesNotExist:
+        set_cached_data(cache_key, True, NOT_FOUND_TIMEOUT)
+        return None
+
+
+def clear_not_found(model, **lookup) -> None:
+    """
+        Forget a cached miss once a matching row has been created. Inside a transaction this waits for the commit,
+        so a concurrent reader cannot cache the miss again before the row is visible.
 
-    # Fetch the Redis client
-    redis_client = cache._cache.get_client(1)
+        :param model: The model the row was created in.
+        :param lookup: Field lookups identifying the row, the same ones get_or_none_cached is called with.
+        :return: None
+    """
+    cache_key = not_found_cache_key(model, **lookup)
+    transaction.on_commit(lambda: call_cache(lambda: cache.delete(cache_key)))
+
+
+def user_family(pattern_string: str):
+    """
+        Declare a user scoped cache family for cache_response, resolved against the requesting user.
+
+        :param pattern_string: The name of the cache family.
+        :return: A callable returning the family name for a request.
+    """
+    return lambda request: user_cache_family(user_id=request.user.id, pattern_string=pattern_string)
+
+
+def _key_scope(request, scope: str) -> str:
+    if scope == SCOPE_USER:
+        return str(request.user.id)
+    if scope == SCOPE_ROLE:
+        return "company" if request.user.company else "employee"
+    return "all"
+
+
+def build_request_cache_key(key_prefix: str, request, scope: str = None, **kwargs) -> str:
+    """
+        Build a canonical key for a request, so the order of query parameters does not split the cache.
+
+        :param key_prefix: Prefix of the key, usually the name of its cache family.
+        :param request: The request being cached.
+        :param scope: SCOPE_USER or SCOPE_ROLE to partition the key per user or per role, None to share it.
+        :param kwargs: URL keyword arguments of the view.
+        :return: The unversioned cache key.
+    """
+    query_params = request.query_params
+    params = sorted(kwargs.items()) + sorted(
+        (name, value) for name in query_params for value in query_params.getlist(name)
+    )
+    digest = hashlib.md5(urlencode(params).encode()).hexdigest()
+
+    return f"{key_prefix}:{_key_scope(request, scope)}:{digest}"
+
+
+class UncacheableResponse(Exception):
+    def __init__(self, response: Response):
+        self.response = response
+        super().__init__()
+
+
+def cache_response(key_prefix: str, timeout: int, families: list = None, scope: str = None, local: bool = False,
+                   stale: bool = False, overlay=None, overlay_families: list = None):
+    """
+        Cache-aside decorator for APIView handlers. Successful response bodies are cached under a canonical
+        key carrying the generation of the given families; anything else is returned without being cached.
+
+        Cached bodies carry a strong ETag derived from that key, so a matching If-None-Match is answered with
+        304 Not Modified before anything is read from the cache or built.
+
+        :param key_prefix: Prefix of the cache key.
+        :param timeout: Time in seconds for the cache to expire.
+        :param families: Cache families of the response, as names or user_family() declarations.
+                         Defaults to the key prefix.
+        :param scope: SCOPE_USER or SCOPE_ROLE for responses that differ per user or per role.
+        :param local: Also use the in-process cache. Only meant for hot, read-mostly responses.
+        :param stale: Serve the previous body while a single worker rebuilds it.
+        :param overlay: Callable taking the request and the cached data and returning the data to respond with.
+                        Lets a shared cached payload be personalised per user. It must not mutate the cached data.
+        :param overlay_families: Cache families the overlay reads from, as for families. Their generations are
+                                 part of the ETag, so personalised bodies get a new one when they change.
+    """
+    families = families or [key_prefix]
+    overlay_families = overlay_families or []
+
+    def decorator(view_method):
+        def get_cache_keys(request, kwargs) -> tuple:
+            base_key = build_request_cache_key(key_prefix, request, scope=scope, **kwargs)
+            cache_key = make_cache_key(
+                base_key, families=[family(request) if callable(family) else family for family in families]
+            )
+            return base_key, cache_key
+
+        def get_etag(request, cache_key) -> str:
+            etag_key = make_cache_key(
+                cache_key, families=[family(request) if callable(family) else family for family in overlay_families]
+            )
+            return quote_etag(hashlib.md5(etag_key.encode()).hexdigest())
+
+        def build(view, request, args, kwargs):
+            response = view_method(view, request, *args, **kwargs)
+
+            if response.status_code != status.HTTP_200_OK:
+                raise UncacheableResponse(response)
+            return response.data
+
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            base_key, cache_key = get_cache_keys(request, kwargs)
+
+            # Without the backend the generations are unknown, so there is nothing to revalidate against
+            etag = None if cache_breaker.is_open else get_etag(request, cache_key)
+
+            if etag is not None and etag in parse_etags(request.headers.get("If-None-Match", "")):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+            try:
+                data, is_stale = _get_or_build_cached_data(
+                    cache_key=cache_key, build=lambda: build(view, request, args, kwargs), timeout=timeout,
+                    stale_key=base_key if stale else None, local=local
+                )
+            except UncacheableResponse as e:
+                return e.response
+
+            if overlay is not None:
+                data = {**data, "data": overlay(request, data["data"])}
 
-    # Fetch keys matching the pattern
-    cache_keys = redis_client.keys(pattern)
+            # A stale body does not match the current generation, so it must not be revalidated against it
+            return Response(data=data, headers=None if is_stale or etag is None else {"ETag": etag})
+
+        def warm(view, request, *args, **kwargs) -> tuple:
+            """
+                Rebuild and cache the body for the request, whether or not it is already cached.
+
+                :return: The cache key and the cached body.
+            """
+            base_key, cache_key = get_cache_keys(request, kwargs)
+            data = build(view, request, args, kwargs)
+
+            set_cached_data(cache_key=cache_key, data=data, timeout=timeout, local=local)
+            if stale:
+                set_cached_data(cache_key=f"stale:{base_key}", data=data, timeout=STALE_DATA_TIMEOUT)
+
+            return cache_key, data
+
+        wrapper.warm = warm
+        wrapper.cache_families = families
+        return wrapper
+
+    return decorator
+
+
+def warm_view_cache(view_class, query_params: dict = None, **kwargs) -> tuple:
+    """
+        Rebuild the cached response of a view decorated with cache_response, as an anonymous GET request.
+        Only meant for responses shared between users.
+
+        :param view_class: The APIView class.
+        :param query_params: Query parameters of the request.
+        :param kwargs: URL keyword arguments of the view.
+        :return: The cache key and the cached body.
+    """
+    view = view_class()
+    request = view.initialize_request(RequestFactory().get("/", query_params or {}))
+    view.request, view.args, view.kwargs = request, (), kwargs
 
-    # Delete the matched keys
-    if cache_keys:
-        redis_client.delete(*cache_keys)
+    return view_class.get.warm(view, request, **kwargs)
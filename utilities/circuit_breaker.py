@@ -0,0 +1,82 @@
+import threading
+import time
+
+from django.conf import settings
+
+CIRCUIT_BREAKER_DEFAULTS = {
+    "FAILURE_THRESHOLD": 5,
+    "RESET_TIMEOUT": 30,
+}
+
+
+def get_circuit_breaker_setting(name: str):
+    return getattr(settings, "CACHE_CIRCUIT_BREAKER", {}).get(name, CIRCUIT_BREAKER_DEFAULTS[name])
+
+
+class CircuitBreaker:
+    """
+        Stops calling a failing backend for a while instead of letting every request wait on it.
+
+        The breaker opens after FAILURE_THRESHOLD consecutive failures. While it is open, calls are skipped.
+        After RESET_TIMEOUT seconds a single call is let through as a probe: if it succeeds the breaker closes
+        and the recovery callbacks run, otherwise it stays open for another RESET_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._recovery_callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def on_recovery(self, callback) -> None:
+        self._recovery_callbacks.append(callback)
+
+    def allow(self) -> bool:
+        """
+            Whether the next call may go to the backend.
+        """
+        # Read without the lock on the hot path, the breaker is closed nearly all the time
+        if self._opened_at is None:
+            return True
+
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < get_circuit_breaker_setting("RESET_TIMEOUT"):
+                return False
+
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        if self._opened_at is None and not self._failures:
+            return None
+
+        with self._lock:
+            recovered = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+        if recovered:
+            for callback in self._recovery_callbacks:
+                callback()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+
+            if self._probing or self._failures >= get_circuit_breaker_setting("FAILURE_THRESHOLD"):
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
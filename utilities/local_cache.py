@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+LOCAL_CACHE_DEFAULTS = {
+    "MAX_SIZE": 2048,
+    "TIMEOUT": 30,
+    "CHANNEL": "jobnest:cache_invalidation",
+}
+
+
+def get_local_cache_setting(name: str):
+    return getattr(settings, "LOCAL_CACHE", {}).get(name, LOCAL_CACHE_DEFAULTS[name])
+
+
+def get_redis_client():
+    """
+        Return a client sharing the default cache's Redis connection pool, or None for other backends.
+    """
+    backend = getattr(cache, "_cache", None)
+
+    if not hasattr(backend, "get_client"):
+        return None
+    return backend.get_client(write=True)
+
+
+class LocalCache:
+    """
+        Bounded, per-process LRU cache with a TTL sitting in front of the shared cache backend.
+
+        Invalidations are broadcast over a Redis pub/sub channel, and every worker listening on it
+        drops the matching entries. The TTL bounds how stale an entry can get if a message is lost.
+    """
+
+    def __init__(self):
+        self._entries = TTLCache(maxsize=get_local_cache_setting("MAX_SIZE"),
+                                 ttl=get_local_cache_setting("TIMEOUT"))
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def get(self, key: str, default=None):
+        self._ensure_listener()
+
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+
+    def delete(self, keys: list) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def broadcast_delete(self, keys: list, pipeline=None) -> None:
+        """
+            Drop the keys locally and tell every other worker to drop them too.
+
+            :param keys: Keys to drop from every local cache.
+            :param pipeline: Redis pipeline to queue the broadcast on instead of sending it right away.
+            :return: None
+        """
+        self.delete(keys)
+
+        if pipeline is not None:
+            pipeline.publish(get_local_cache_setting("CHANNEL"), "\n".join(keys))
+            return None
+
+        client = get_redis_client()
+        if client is None:
+            return None
+
+        try:
+            client.publish(get_local_cache_setting("CHANNEL"), "\n".join(keys))
+        except RedisError:
+            # Other workers will catch up once their entries expire
+            pass
+
+    def _ensure_listener(self) -> None:
+        # Started lazily and per pid, so forked workers get their own listener thread
+        if self._listener_pid == os.getpid() or get_redis_client() is None:
+            return None
+
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return None
+            self._listener_pid = os.getpid()
+
+        threading.Thread(target=self._listen, name="local-cache-invalidation", daemon=True).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(get_local_cache_setting("CHANNEL"))
+
+                # Anything published while we were not subscribed is lost, so start from scratch
+                self.clear()
+
+                while True:
+                    # Polled rather than blocking on the socket, which would trip the cache's socket timeout
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.delete(message["data"].decode().split("\n"))
+            except RedisError:
+                self.clear()
+                time.sleep(1)
+
+
+local_cache = LocalCache()
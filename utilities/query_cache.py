@@ -0,0 +1,127 @@
+import hashlib
+from functools import lru_cache
+
+from django.apps import apps
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models
+from django.db.models.query import ModelIterable, ValuesIterable, FlatValuesListIterable
+from django.db.models.signals import post_save, post_delete
+
+from utilities.caching import get_or_build_cached_data, make_cache_key, invalidate_cache_families, \
+    is_invalidation_pending
+
+QUERY_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Result shapes that come back from the codec unchanged. Tuples would come back as lists, so values_list()
+# without flat=True is not cached.
+CACHEABLE_ITERABLES = (ModelIterable, ValuesIterable, FlatValuesListIterable)
+
+# Tables of the models managed by a CachedManager
+_cached_tables = set()
+
+
+def table_family(db_table: str) -> str:
+    return f"table_{db_table}"
+
+
+@lru_cache(maxsize=None)
+def _all_tables() -> frozenset:
+    return frozenset(model._meta.db_table for model in apps.get_models(include_auto_created=True))
+
+
+def invalidate_table_cache(model) -> None:
+    """
+        Bump the version of a model's table, so every cached query reading from it is rebuilt.
+
+        :param model: A model managed by a CachedManager.
+        :return: None
+    """
+    invalidate_cache_families([table_family(model._meta.db_table)])
+
+
+class CachedQuerySet(models.QuerySet):
+    """
+        QuerySet whose results are cached, keyed by their SQL and the version of every table they read.
+
+        Only queries reading from cached tables alone are cached, anything joining or filtering on another table
+        goes to the database. Writes through the queryset or to instances bump the version of the table.
+    """
+
+    def _query_cache_key(self):
+        if (
+            self._iterable_class not in CACHEABLE_ITERABLES
+            or self._prefetch_related_lookups
+            or self.query.select_for_update
+        ):
+            return None
+
+        connection = connections[self.db]
+        try:
+            sql, params = self.query.get_compiler(using=self.db).as_sql()
+        except EmptyResultSet:
+            return None
+
+        tables = sorted(table for table in _all_tables() if connection.ops.quote_name(table) in sql)
+        if not tables or not _cached_tables.issuperset(tables):
+            return None
+
+        # Uncommitted writes of this transaction are not visible to other workers, nor are they in the cache
+        families = [table_family(table) for table in tables]
+        if is_invalidation_pending(families):
+            return None
+
+        query_hash = hashlib.md5(f"{self.db}:{self._iterable_class.__name__}:{sql}:{params!r}".encode()).hexdigest()
+        return make_cache_key(f"query:{tables[0]}:{query_hash}", families=families)
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            cache_key = self._query_cache_key()
+
+            if cache_key is not None:
+                self._result_cache = get_or_build_cached_data(
+                    cache_key=cache_key, build=lambda: list(self._iterable_class(self)), timeout=QUERY_CACHE_TIMEOUT
+                )
+
+        super()._fetch_all()
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        invalidate_table_cache(self.model)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        invalidate_table_cache(self.model)
+        return objs
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, *args, **kwargs):
+        rows = super().bulk_update(*args, **kwargs)
+        invalidate_table_cache(self.model)
+        return rows
+
+    bulk_update.alters_data = True
+
+
+def _invalidate_instance_table(sender, **kwargs):
+    invalidate_table_cache(sender)
+
+
+class CachedManager(models.Manager.from_queryset(CachedQuerySet)):
+    """
+        Opt-in query cache for read-mostly models: use it as the model's default manager and every query made
+        through it is cached until the next write to the table.
+    """
+
+    def contribute_to_class(self, cls, name):
+        super().contribute_to_class(cls, name)
+
+        if cls._meta.abstract:
+            return None
+
+        _cached_tables.add(cls._meta.db_table)
+        post_save.connect(_invalidate_instance_table, sender=cls, dispatch_uid=f"query_cache_{cls._meta.label}")
+        post_delete.connect(_invalidate_instance_table, sender=cls, dispatch_uid=f"query_cache_{cls._meta.label}")